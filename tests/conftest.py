@@ -33,6 +33,16 @@ assert any(app in INSTALLED_APPS for app in ['posts.apps.PostsConfig', 'posts'])
     'Пожалуйста зарегистрируйте приложение в `settings.INSTALLED_APPS`'
 )
 
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def inline_background_jobs(settings):
+    # Фоновые задачи выполняются сразу: иначе они переживают тест
+    # и мешают очистке базы и MEDIA_ROOT
+    settings.BACKGROUND_WORKERS = 0
+
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
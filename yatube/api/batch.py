@@ -0,0 +1,198 @@
+"""
+Пакетные методы API: много постов, комментариев или подписок
+за один запрос.
+
+Каждый объект проверяется теми же формами, что и по одному,
+проверки существования делаются одним запросом на весь пакет,
+а корректные объекты вставляются одним bulk_create. Проверка
+и вставка идут в одной транзакции. В ответе results — итог
+по каждому объекту в порядке запроса: статус и id или ошибки.
+id сообщается, только если строку удалось однозначно найти после
+вставки (см. BulkCreateQuerySet._fill_ids).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+
+from .http import (
+    ApiError, api_view, json_response, login_required, request_data
+)
+
+NOT_AN_OBJECT = {
+    'status': 400, 'errors': {'__all__': ['Ожидается объект']},
+}
+
+
+def batch_items(request):
+    login_required(request)
+    items = request_data(request).get('items')
+    if not isinstance(items, list) or not items:
+        raise ApiError(400, 'Ожидается непустой список items')
+    if len(items) > settings.API_BATCH_LIMIT:
+        raise ApiError(
+            400, f'Не больше {settings.API_BATCH_LIMIT} объектов за запрос'
+        )
+    return items
+
+
+def invalid(errors):
+    return {
+        'status': 400,
+        'errors': {
+            field: list(messages) for field, messages in errors.items()
+        },
+    }
+
+
+class Batch:
+    """Итоги по объектам пакета; id созданных известны после вставки."""
+
+    def __init__(self):
+        self.results = []
+        self.pending = []
+
+    def add(self, result):
+        self.results.append(result)
+
+    def create(self, obj, status=201):
+        result = {'status': status}
+        self.results.append(result)
+        self.pending.append((result, obj))
+
+    def response(self):
+        for result, obj in self.pending:
+            if obj.pk is not None:
+                result['id'] = obj.pk
+        return json_response({'results': self.results})
+
+
+def atomic_batch(view_func):
+    """Проверка и вставка пакета — одна транзакция."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return view_func(request, *args, **kwargs)
+        except IntegrityError:
+            # Связанный объект удалён или создан параллельным запросом
+            raise ApiError(409, 'Данные изменились, повторите запрос')
+    return wrapper
+
+
+@api_view('POST')
+@atomic_batch
+def posts_batch(request):
+    items = batch_items(request)
+    slugs = {
+        item.get('group') for item in items
+        if isinstance(item, dict) and isinstance(item.get('group'), str)
+    }
+    groups = dict(
+        Group.objects.filter(slug__in=slugs).values_list('slug', 'id')
+    )
+    batch, posts = Batch(), []
+    for item in items:
+        if not isinstance(item, dict):
+            batch.add(NOT_AN_OBJECT)
+            continue
+        slug = item.get('group')
+        if isinstance(slug, str):
+            item = {**item, 'group': groups.get(slug, slug)}
+        form = PostForm(item)
+        if not form.is_valid():
+            batch.add(invalid(form.errors))
+            continue
+        post = form.save(commit=False)
+        post.author = request.user
+        posts.append(post)
+        batch.create(post)
+    Post.objects.bulk_create(posts)
+    return batch.response()
+
+
+def post_id(item):
+    """
+    id поста из объекта пакета. true/false в JSON — тоже int
+    в Python (True == 1), поэтому bool отсекается отдельно.
+    """
+    value = item.get('post')
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+@api_view('POST')
+@atomic_batch
+def comments_batch(request):
+    items = batch_items(request)
+    post_ids = {
+        post_id(item) for item in items if isinstance(item, dict)
+    }
+    post_ids.discard(None)
+    existing = set(
+        Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True)
+    )
+    batch, comments = Batch(), []
+    for item in items:
+        if not isinstance(item, dict):
+            batch.add(NOT_AN_OBJECT)
+            continue
+        form = CommentForm(item)
+        errors = dict(form.errors)
+        if post_id(item) not in existing:
+            errors['post'] = ['Пост не найден']
+        if errors:
+            batch.add(invalid(errors))
+            continue
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post_id = item['post']
+        comments.append(comment)
+        batch.create(comment)
+    Comment.objects.bulk_create(comments)
+    return batch.response()
+
+
+@api_view('POST')
+@atomic_batch
+def follows_batch(request):
+    items = batch_items(request)
+    usernames = {
+        item.get('author') for item in items
+        if isinstance(item, dict) and isinstance(item.get('author'), str)
+    }
+    authors = dict(
+        User.objects.filter(username__in=usernames).values_list(
+            'username', 'id'
+        )
+    )
+    # Уже существующие и созданные в этом пакете подписки
+    follows = {
+        follow.author_id: follow
+        for follow in Follow.objects.filter(
+            user=request.user, author_id__in=authors.values()
+        )
+    }
+    batch, created = Batch(), []
+    for item in items:
+        if not isinstance(item, dict):
+            batch.add(NOT_AN_OBJECT)
+            continue
+        author_id = authors.get(item.get('author'))
+        if author_id is None:
+            batch.add(invalid({'author': ['Автор не найден']}))
+        elif author_id == request.user.pk:
+            batch.add(invalid({'author': ['Нельзя подписаться на себя']}))
+        elif author_id in follows:
+            batch.create(follows[author_id], status=200)
+        else:
+            follow = Follow(user=request.user, author_id=author_id)
+            follows[author_id] = follow
+            created.append(follow)
+            batch.create(follow)
+    Follow.objects.bulk_create(created)
+    return batch.response()
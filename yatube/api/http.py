@@ -0,0 +1,142 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import HttpResponse, QueryDict
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+TOKEN_SALT = 'api.token'
+
+
+class ApiError(Exception):
+    """Ошибка, которая отдаётся клиенту как JSON с нужным статусом."""
+
+    def __init__(self, status, detail, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.body = {'detail': detail, **extra}
+
+
+def json_response(data, status=200):
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return HttpResponse(
+        content, status=status, content_type='application/json'
+    )
+
+
+def no_content():
+    return HttpResponse(status=204)
+
+
+def request_data(request):
+    """
+    Тело запроса: JSON-объект словарём или обычная форма (в том числе
+    с файлами) изменяемым QueryDict — повторённые поля формы не
+    теряются, а формы читают их getlist, где список допустим.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ApiError(400, 'Некорректный JSON')
+        if not isinstance(data, dict):
+            raise ApiError(400, 'Ожидается JSON-объект')
+        return data
+    if request.method == 'POST':
+        return request.POST.copy()
+    # Django разбирает тело формы только для POST
+    return QueryDict(request.body, mutable=True, encoding=request.encoding)
+
+
+def form_errors(form):
+    return ApiError(400, 'Ошибка в данных', errors={
+        field: list(errors) for field, errors in form.errors.items()
+    })
+
+
+def issue_token(user):
+    """
+    Подписанный токен для мобильных клиентов. В нём хэш сессии
+    пользователя, поэтому смена пароля отзывает все токены.
+    """
+    return signing.dumps(
+        [user.pk, user.get_session_auth_hash()], salt=TOKEN_SALT
+    )
+
+
+def _authenticate_token(request):
+    """
+    Заголовок «Authorization: Token …»: без cookie, поэтому
+    проверка CSRF для таких запросов не нужна. Проверка подписи
+    дешевле хэширования пароля на каждый запрос.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Token '):
+        return False
+    try:
+        pk, auth_hash = signing.loads(
+            header[len('Token '):], salt=TOKEN_SALT,
+            max_age=settings.API_TOKEN_MAX_AGE,
+        )
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ApiError(401, 'Недействительный токен')
+    user = get_user_model().objects.filter(pk=pk, is_active=True).first()
+    if user is None or not constant_time_compare(
+        auth_hash, user.get_session_auth_hash()
+    ):
+        raise ApiError(401, 'Недействительный токен')
+    request.user = user
+    return True
+
+
+def _enforce_csrf(request):
+    if CsrfViewMiddleware().process_view(request, None, (), {}):
+        raise ApiError(403, 'Ошибка проверки CSRF')
+
+
+def login_required(request):
+    if not request.user.is_authenticated:
+        raise ApiError(401, 'Нужна авторизация')
+
+
+def api_view(*methods):
+    """
+    Обёртка для view API: допустимые методы, аутентификация
+    (сессия с проверкой CSRF или токен), ошибки в JSON и ETag
+    для ответов на GET.
+    """
+    def decorator(view_func):
+        @csrf_exempt
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise ApiError(405, 'Метод не поддерживается')
+                token = _authenticate_token(request)
+                if (request.method not in SAFE_METHODS and not token
+                        and request.user.is_authenticated):
+                    _enforce_csrf(request)
+                response = view_func(request, *args, **kwargs)
+            except ApiError as error:
+                response = json_response(error.body, status=error.status)
+                if error.status == 405:
+                    response['Allow'] = ', '.join(methods)
+                return response
+            if request.method == 'GET' and response.status_code == 200:
+                response['ETag'] = quote_etag(
+                    hashlib.md5(response.content).hexdigest()
+                )
+                return get_conditional_response(
+                    request, etag=response['ETag'], response=response
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+"""
+Описание ресурсов API: какое поле ответа из какой колонки берётся.
+
+Строки читаются одним запросом через QuerySet.values() со всеми
+нужными JOIN, без создания объектов моделей, поэтому связанные
+данные (имя автора, slug группы) не порождают N+1.
+"""
+from django.conf import settings
+
+from .http import ApiError
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def media_url(name):
+    return settings.MEDIA_URL + name if name else None
+
+
+class Resource:
+    """
+    fields — имя поля ответа → колонка values() или пара
+    (колонка, функция преобразования значения).
+    """
+
+    def __init__(self, **fields):
+        self.fields = {
+            name: column if isinstance(column, tuple) else (column, None)
+            for name, column in fields.items()
+        }
+
+    def select(self, requested=None):
+        """Поля из параметра ?fields=a,b (sparse fieldset) или все."""
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(',')]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(400, f'Неизвестные поля: {", ".join(unknown)}')
+        return names
+
+    def columns(self, names):
+        return [self.fields[name][0] for name in names]
+
+    def dump(self, rows, names):
+        fields = [(name, *self.fields[name]) for name in names]
+        return [
+            {
+                name: convert(row[column]) if convert else row[column]
+                for name, column, convert in fields
+            }
+            for row in rows
+        ]
+
+
+POST = Resource(
+    id='id',
+    text='text',
+    pub_date=('pub_date', isoformat),
+    author='author__username',
+    group='group__slug',
+    image=('image', media_url),
+)
+
+GROUP = Resource(
+    id='id',
+    title='title',
+    slug='slug',
+    description='description',
+)
+
+COMMENT = Resource(
+    id='id',
+    post='post_id',
+    author='author__username',
+    text='text',
+    created=('created', isoformat),
+)
+
+FOLLOW = Resource(
+    id='id',
+    author='author__username',
+)
@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import stats  # isort:skip
+from posts.models import Comment, Follow, Post, TimelineEntry  # isort:skip
+from .test_views import ApiTestCase  # isort:skip
+
+User = get_user_model()
+
+
+class BatchApiTests(ApiTestCase):
+
+    def test_posts_batch(self):
+        items = [
+            {'text': f'Пост {i}', 'group': 'group'} for i in range(50)
+        ] + [{'text': ''}, 'пост', {'text': 'Пост', 'group': 'missing'}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.call(
+                'post', reverse('api:posts_batch'), {'items': items}
+            )
+        results = response.json()['results']
+
+        self.assertEqual([r['status'] for r in results[:50]], [201] * 50)
+        self.assertEqual([r['status'] for r in results[50:]], [400] * 3)
+        self.assertIn('text', results[50]['errors'])
+        self.assertIn('group', results[52]['errors'])
+        posts = Post.objects.filter(pk__in=[r['id'] for r in results[:50]])
+        self.assertEqual(
+            sorted(post.text for post in posts),
+            sorted(item['text'] for item in items[:50])
+        )
+        self.assertEqual(stats.for_author(self.author).post_count, 50)
+        # Вставка — один запрос на пакет, а не на пост
+        inserts = [q for q in queries if q['sql'].startswith(
+            'INSERT INTO "posts_post"'
+        )]
+        self.assertEqual(len(inserts), 1)
+
+    def test_comments_batch(self):
+        post = Post.objects.create(text='Пост', author=self.reader)
+        response = self.call('post', reverse('api:comments_batch'), {
+            'items': [
+                {'post': post.id, 'text': 'Первый'},
+                {'post': post.id, 'text': 'Второй'},
+                {'post': post.id + 1, 'text': 'Мимо'},
+            ]
+        })
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], [201, 201, 400])
+        self.assertEqual(
+            Comment.objects.get(pk=results[1]['id']).text, 'Второй'
+        )
+
+    def test_comments_batch_rejects_bool_post(self):
+        """true в JSON равно 1 в Python, но id поста не является."""
+        Post.objects.create(pk=1, text='Пост', author=self.reader)
+        response = self.call('post', reverse('api:comments_batch'), {
+            'items': [{'post': True, 'text': 'Мимо'}]
+        })
+        result = response.json()['results'][0]
+        self.assertEqual(result['status'], 400)
+        self.assertIn('post', result['errors'])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_follows_batch(self):
+        others = [
+            User.objects.create_user(username=f'other{i}') for i in range(3)
+        ]
+        Post.objects.create(text='Пост', author=others[0])
+        Follow.objects.create(user=self.author, author=others[1])
+        response = self.call('post', reverse('api:follows_batch'), {
+            'items': [
+                {'author': 'other0'}, {'author': 'other1'},
+                {'author': 'other2'}, {'author': 'other2'},
+                {'author': 'author'}, {'author': 'nobody'},
+            ]
+        })
+        results = response.json()['results']
+        self.assertEqual(
+            [r['status'] for r in results], [201, 200, 201, 200, 400, 400]
+        )
+        self.assertEqual(results[2]['id'], results[3]['id'])
+        self.assertEqual(Follow.objects.filter(user=self.author).count(), 3)
+        # Побочные эффекты подписки, как и у Follow.objects.create
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.author, author=others[0]
+        ).exists())
+        self.assertEqual(stats.for_author(others[2]).follower_count, 1)
+
+    def test_batch_limits(self):
+        url = reverse('api:posts_batch')
+        self.assertEqual(self.call('post', url, {'items': []}).status_code,
+                         400)
+        with self.settings(API_BATCH_LIMIT=2):
+            response = self.call('post', url, {'items': [{'text': 'a'}] * 3})
+        self.assertEqual(response.status_code, 400)
+        response = self.call('post', url, {'items': [{'text': 'a'}]},
+                             token=False)
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,220 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.http import request_data  # isort:skip
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+
+User = get_user_model()
+
+
+class ApiTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', password='password'
+        )
+        cls.reader = User.objects.create_user(
+            username='reader', password='password'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.token = self.client.post(
+            reverse('api:token'),
+            {'username': 'author', 'password': 'password'},
+        ).json()['token']
+
+    def call(self, method, url, data=None, token=True, **extra):
+        if token:
+            extra['HTTP_AUTHORIZATION'] = f'Token {self.token}'
+        if method == 'get':
+            return self.client.get(url, data, **extra)
+        return getattr(self.client, method)(
+            url, json.dumps(data or {}), content_type='application/json',
+            **extra
+        )
+
+
+class PostApiTests(ApiTestCase):
+
+    def test_pages_cover_all_posts(self):
+        posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=self.author, group=self.group
+            )
+            for i in range(5)
+        ]
+        url = reverse('api:posts') + '?limit=2&fields=id,author,group'
+        seen = []
+        while url:
+            data = self.call('get', url, token=False).json()
+            seen += data['results']
+            url = data['next']
+        self.assertEqual(
+            [item['id'] for item in seen],
+            [post.id for post in reversed(posts)]
+        )
+        self.assertEqual(
+            seen[0], {'id': posts[-1].id, 'author': 'author',
+                      'group': 'group'}
+        )
+
+    def test_list_queries(self):
+        for i in range(100):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        url = reverse('api:posts')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.call('get', url, {'limit': 100}, token=False)
+        self.assertEqual(len(response.json()['results']), 100)
+        # Строки страницы и EXISTS за ней: страница полная
+        self.assertEqual(len(queries), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.call('get', url, {'limit': 99}, token=False)
+        self.assertEqual(len(queries), 2)
+
+    def test_unknown_fields(self):
+        response = self.call(
+            'get', reverse('api:posts'), {'fields': 'id,secret'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        Post.objects.create(text='Пост', author=self.author)
+        url = reverse('api:posts')
+        etag = self.call('get', url, token=False)['ETag']
+        response = self.call(
+            'get', url, token=False, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_create_uses_form_validation(self):
+        response = self.call(
+            'post', reverse('api:posts'), {'text': '', 'group': 'group'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+
+        response = self.call(
+            'post', reverse('api:posts'), {'text': 'Новый', 'group': 'group'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['group'], 'group')
+        post = Post.objects.get(pk=response.json()['id'])
+        self.assertEqual(post.author, self.author)
+
+    def test_form_encoded_patch(self):
+        post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group
+        )
+        response = self.client.patch(
+            reverse('api:post', args=(post.id,)), 'text=Правка',
+            content_type='application/x-www-form-urlencoded',
+            HTTP_AUTHORIZATION=f'Token {self.token}',
+        )
+        self.assertEqual(response.json()['text'], 'Правка')
+        self.assertEqual(response.json()['group'], 'group')
+
+    def test_anonymous_cannot_write(self):
+        response = self.call(
+            'post', reverse('api:posts'), {'text': 'Пост'}, token=False
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_only_author_edits(self):
+        post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group
+        )
+        url = reverse('api:post', args=(post.id,))
+        response = self.call('patch', url, {'text': 'Правка'})
+        self.assertEqual(response.json()['text'], 'Правка')
+        self.assertEqual(response.json()['group'], 'group')
+
+        self.client.force_login(self.reader)
+        response = self.call('delete', url, token=False)
+        self.assertEqual(response.status_code, 403)
+        response = self.call('delete', url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Post.objects.filter(pk=post.id).exists())
+
+    def test_session_writes_require_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.author)
+        response = client.post(
+            reverse('api:posts'), json.dumps({'text': 'Пост'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_token_revoked_by_password_change(self):
+        self.author.set_password('new-password')
+        self.author.save()
+        response = self.call('post', reverse('api:posts'), {'text': 'Пост'})
+        self.assertEqual(response.status_code, 401)
+
+
+class RelatedApiTests(ApiTestCase):
+
+    def test_groups(self):
+        response = self.call('get', reverse('api:groups'), token=False)
+        self.assertEqual(response.json()['results'][0]['slug'], 'group')
+        response = self.call(
+            'get', reverse('api:group', args=('missing',)), token=False
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments(self):
+        post = Post.objects.create(text='Пост', author=self.reader)
+        url = reverse('api:comments', args=(post.id,))
+        response = self.call('post', url, {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.get().author, self.author)
+
+        results = self.call('get', url, token=False).json()['results']
+        self.assertEqual(results[0]['author'], 'author')
+        self.assertEqual(results[0]['post'], post.id)
+
+    def test_follows(self):
+        url = reverse('api:follows')
+        self.assertEqual(
+            self.call('post', url, {'author': 'reader'}).status_code, 201
+        )
+        self.assertEqual(
+            self.call('post', url, {'author': 'reader'}).status_code, 200
+        )
+        self.assertEqual(
+            self.call('post', url, {'author': 'author'}).status_code, 400
+        )
+        results = self.call('get', url).json()['results']
+        self.assertEqual([item['author'] for item in results], ['reader'])
+
+        response = self.call('delete', reverse('api:follow', args=('reader',)))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.exists())
+
+
+class RequestDataTests(SimpleTestCase):
+
+    def test_repeated_form_fields_are_kept(self):
+        factory = RequestFactory()
+        requests = (
+            factory.post('/', {'tag': ['a', 'b'], 'text': 'Пост'}),
+            factory.put(
+                '/', 'tag=a&tag=b&text=%D0%9F%D0%BE%D1%81%D1%82',
+                content_type='application/x-www-form-urlencoded',
+            ),
+        )
+        for request in requests:
+            with self.subTest(method=request.method):
+                data = request_data(request)
+                self.assertEqual(data.getlist('tag'), ['a', 'b'])
+                self.assertEqual(data.get('text'), 'Пост')
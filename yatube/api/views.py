@@ -0,0 +1,246 @@
+from django.contrib.auth import authenticate
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils.http import urlencode
+from core.query_budget import query_budget
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import CursorPaginator
+
+from . import serializers
+from .http import (
+    ApiError, api_view, form_errors, issue_token, json_response,
+    login_required, no_content, request_data
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+CURSOR_SALT = 'api.views.cursor'
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError(400, 'limit должен быть числом')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.dict()
+    params['cursor'] = cursor
+    return f'{request.path}?{urlencode(params)}'
+
+
+def paginated(request, queryset, resource, date_field):
+    """Страница ресурса по курсору (date_field, id), от новых к старым."""
+    names = resource.select(request.GET.get('fields'))
+    rows = queryset.values(*resource.columns(names), date_field, 'id')
+    paginator = CursorPaginator(
+        rows, page_limit(request), date_field=date_field
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    return json_response({
+        'results': resource.dump(page, names),
+        'next': page_url(request, paginator.next_cursor),
+        'previous': page_url(request, paginator.previous_cursor),
+    })
+
+
+def detail(request, queryset, resource, status=200):
+    names = resource.select(request.GET.get('fields'))
+    rows = queryset.values(*resource.columns(names))[:1]
+    if not rows:
+        raise ApiError(404, 'Не найдено')
+    return json_response(resource.dump(rows, names)[0], status=status)
+
+
+def post_form_data(data):
+    """В API группа задаётся slug'ом, форма ждёт первичный ключ."""
+    slug = data.get('group')
+    if slug:
+        data['group'] = Group.objects.filter(slug=slug).values_list(
+            'id', flat=True
+        ).first() or slug
+    return data
+
+
+@api_view('POST')
+def token(request):
+    data = request_data(request)
+    user = authenticate(
+        request,
+        username=data.get('username'),
+        password=data.get('password'),
+    )
+    if user is None:
+        raise ApiError(400, 'Неверное имя пользователя или пароль')
+    return json_response({'token': issue_token(user)})
+
+
+# Посты
+
+@api_view('GET', 'POST')
+@query_budget(4)
+def posts(request):
+    if request.method == 'POST':
+        return create_post(request)
+    queryset = Post.objects.all()
+    if 'group' in request.GET:
+        queryset = queryset.filter(group__slug=request.GET['group'])
+    if 'author' in request.GET:
+        queryset = queryset.filter(author__username=request.GET['author'])
+    return paginated(request, queryset, serializers.POST, 'pub_date')
+
+
+def create_post(request):
+    login_required(request)
+    form = PostForm(
+        post_form_data(request_data(request)), request.FILES or None
+    )
+    if not form.is_valid():
+        raise form_errors(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    return detail(
+        request, Post.objects.filter(pk=post.pk), serializers.POST, 201
+    )
+
+
+@api_view('GET', 'PUT', 'PATCH', 'DELETE')
+@query_budget(3)
+def post(request, post_id):
+    queryset = Post.objects.filter(pk=post_id)
+    if request.method == 'GET':
+        return detail(request, queryset, serializers.POST)
+    login_required(request)
+    instance = queryset.first()
+    if instance is None:
+        raise ApiError(404, 'Не найдено')
+    if instance.author_id != request.user.pk:
+        raise ApiError(403, 'Изменять пост может только автор')
+    if request.method == 'DELETE':
+        instance.delete()
+        return no_content()
+    data = post_form_data(request_data(request))
+    if request.method == 'PATCH':
+        # setdefault, а не {**data}: у формы важны все значения поля
+        data.setdefault('text', instance.text)
+        data.setdefault('group', instance.group_id)
+    form = PostForm(data, request.FILES or None, instance=instance)
+    if not form.is_valid():
+        raise form_errors(form)
+    form.save()
+    return detail(request, queryset, serializers.POST)
+
+
+# Группы
+
+@api_view('GET')
+@query_budget(3)
+def groups(request):
+    names = serializers.GROUP.select(request.GET.get('fields'))
+    rows = Group.objects.order_by('title').values(
+        *serializers.GROUP.columns(names)
+    )
+    return json_response({'results': serializers.GROUP.dump(rows, names)})
+
+
+@api_view('GET')
+@query_budget(3)
+def group(request, slug):
+    return detail(
+        request, Group.objects.filter(slug=slug), serializers.GROUP
+    )
+
+
+# Комментарии
+
+@api_view('GET', 'POST')
+@query_budget(4)
+def comments(request, post_id):
+    if request.method == 'GET':
+        return paginated(
+            request, Comment.objects.filter(post_id=post_id),
+            serializers.COMMENT, 'created'
+        )
+    login_required(request)
+    if not Post.objects.filter(pk=post_id).exists():
+        raise ApiError(404, 'Не найдено')
+    form = CommentForm(request_data(request))
+    if not form.is_valid():
+        raise form_errors(form)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post_id = post_id
+    comment.save()
+    return detail(
+        request, Comment.objects.filter(pk=comment.pk),
+        serializers.COMMENT, 201
+    )
+
+
+# Подписки
+
+@api_view('GET', 'POST')
+@query_budget(4)
+def follows(request):
+    login_required(request)
+    if request.method == 'POST':
+        return create_follow(request)
+    # У подписок нет даты, поэтому курсор — просто последний id
+    resource = serializers.FOLLOW
+    names = resource.select(request.GET.get('fields'))
+    queryset = Follow.objects.filter(user=request.user).order_by('-id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            queryset = queryset.filter(
+                id__lt=signing.loads(cursor, salt=CURSOR_SALT)
+            )
+        except signing.BadSignature:
+            raise ApiError(400, 'Некорректный курсор')
+    limit = page_limit(request)
+    rows = list(queryset.values(*resource.columns(names), 'id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = signing.dumps(rows[-1]['id'], salt=CURSOR_SALT)
+    return json_response({
+        'results': resource.dump(rows, names),
+        'next': page_url(request, next_cursor),
+    })
+
+
+def create_follow(request):
+    username = request_data(request).get('author')
+    author = User.objects.filter(username=username).first()
+    if author is None:
+        raise ApiError(400, 'Автор не найден')
+    if author == request.user:
+        raise ApiError(400, 'Нельзя подписаться на себя')
+    queryset = Follow.objects.filter(user=request.user, author=author)
+    status = 200
+    if not queryset.exists():
+        try:
+            with transaction.atomic():
+                Follow.objects.create(user=request.user, author=author)
+            status = 201
+        except IntegrityError:
+            pass
+    return detail(request, queryset, serializers.FOLLOW, status)
+
+
+@api_view('DELETE')
+@query_budget(4)
+def follow(request, username):
+    login_required(request)
+    deleted, _ = Follow.objects.filter(
+        user=request.user, author__username=username
+    ).delete()
+    if not deleted:
+        raise ApiError(404, 'Подписка не найдена')
+    return no_content()
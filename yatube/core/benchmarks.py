@@ -0,0 +1,11 @@
+"""Общее для команд замеров (bench_*)."""
+
+# Кэш страниц и фрагментов отключён: замеряются запросы, а не попадания
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def percentile(samples, share):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * share))]
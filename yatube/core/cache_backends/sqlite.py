@@ -0,0 +1,309 @@
+"""
+Кэш в файле SQLite, общий для всех процессов-воркеров.
+
+В отличие от LocMemCache запись и инвалидация из одного воркера
+сразу видны остальным, а данные хранятся в одном экземпляре.
+Файл открывается в режиме WAL: читатели не блокируют писателя.
+Целые числа хранятся как INTEGER, поэтому incr/decr выполняются
+атомарно одним UPDATE. При переполнении вытесняются записи,
+к которым дольше всего не обращались (приближённый LRU).
+Число записей поддерживают триггеры в таблице cache_size, поэтому
+проверка переполнения не выполняет COUNT(*) по всей таблице.
+
+Потоки: Django создаёт экземпляр бэкенда на каждый поток,
+у каждого потока своё соединение с файлом. Счётчик записей,
+по которому проверяется переполнение, общий для процесса
+(по файлу кэша) и защищён блокировкой.
+
+Пример настройки:
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+            'LOCATION': '/var/cache/yatube/cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY,'
+    ' value BLOB NOT NULL,'
+    ' expires REAL,'
+    ' accessed REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE TABLE IF NOT EXISTS cache_size ('
+    ' id INTEGER PRIMARY KEY CHECK (id = 0),'
+    ' entries INTEGER NOT NULL'
+    ')',
+    # Для файла, созданного без cache_size, число записей
+    # считается один раз
+    'INSERT INTO cache_size (id, entries) '
+    'SELECT 0, (SELECT COUNT(*) FROM cache) '
+    'WHERE NOT EXISTS (SELECT 1 FROM cache_size)',
+    'CREATE TRIGGER IF NOT EXISTS cache_inserted AFTER INSERT ON cache '
+    'BEGIN UPDATE cache_size SET entries = entries + 1; END',
+    'CREATE TRIGGER IF NOT EXISTS cache_deleted AFTER DELETE ON cache '
+    'BEGIN UPDATE cache_size SET entries = entries - 1; END',
+)
+NOT_EXPIRED = '(expires IS NULL OR expires > ?)'
+
+# Записи с последней проверки размера, по файлам кэша
+_writes = Counter()
+_writes_lock = threading.Lock()
+
+
+class SQLiteCache(BaseCache):
+    """
+    Дополнительные OPTIONS:
+        BUSY_TIMEOUT — сколько секунд ждать блокировку файла (5);
+        ACCESS_RESOLUTION — время последнего обращения обновляется
+            при чтении не чаще раза в столько секунд (1);
+        CULL_CHECK_INTERVAL — размер кэша проверяется раз
+            в столько записей каждого процесса, по всем его потокам (50).
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._access_resolution = float(
+            options.get('ACCESS_RESOLUTION', 1)
+        )
+        self._cull_check_interval = int(
+            options.get('CULL_CHECK_INTERVAL', 50)
+        )
+        self._local = threading.local()
+
+    # Соединение и сериализация
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # INSERT OR REPLACE удаляет старую строку; без этого
+            # триггер удаления для неё не срабатывает
+            connection.execute('PRAGMA recursive_triggers=ON')
+            with _Transaction(connection):
+                for statement in SCHEMA:
+                    connection.execute(statement)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _transaction(self):
+        return _Transaction(self._connection)
+
+    def _encode(self, value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _expiry(self, timeout):
+        # Абсолютное время истечения или None для вечных записей
+        return self.get_backend_timeout(timeout)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    # API кэша
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        row = self._connection.execute(
+            f'SELECT value, accessed FROM cache WHERE key = ? '
+            f'AND {NOT_EXPIRED}', (key, now)
+        ).fetchone()
+        if row is None:
+            return default
+        value, accessed = row
+        if now - accessed > self._access_resolution:
+            self._connection.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?', (now, key)
+            )
+        return self._decode(value)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._connection.execute(
+            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) '
+            f'AND {NOT_EXPIRED}', (*keys, now)
+        ).fetchall()
+        return {keys[key]: self._decode(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                (key, self._encode(value), self._expiry(timeout), time.time())
+            )
+        self._maybe_cull(1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires, now = self._expiry(timeout), time.time()
+        rows = [
+            (self._key(key, version), self._encode(value), expires, now)
+            for key, value in data.items()
+        ]
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', rows
+            )
+        self._maybe_cull(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                f'DELETE FROM cache WHERE key = ? AND NOT {NOT_EXPIRED}',
+                (key, now)
+            )
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?)',
+                (key, self._encode(value), self._expiry(timeout), now)
+            ).rowcount
+        if added:
+            self._maybe_cull(1)
+        return bool(added)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            return bool(connection.execute(
+                f'UPDATE cache SET expires = ? WHERE key = ? '
+                f'AND {NOT_EXPIRED}',
+                (self._expiry(timeout), key, time.time())
+            ).rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._transaction() as connection:
+            updated = connection.execute(
+                f'UPDATE cache SET value = value + ?, accessed = ? '
+                f'WHERE key = ? AND typeof(value) = \'integer\' '
+                f'AND {NOT_EXPIRED}', (delta, now, key, now)
+            ).rowcount
+            if updated:
+                return connection.execute(
+                    'SELECT value FROM cache WHERE key = ?', (key,)
+                ).fetchone()[0]
+            value = connection.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {NOT_EXPIRED}',
+                (key, now)
+            ).fetchone()
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        # Нецелое значение: ведём себя как BaseCache.incr
+        raise TypeError(f"Value of key '{key}' is not an integer")
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def delete_many(self, keys, version=None):
+        keys = [(self._key(key, version),) for key in keys]
+        with self._transaction() as connection:
+            connection.executemany('DELETE FROM cache WHERE key = ?', keys)
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._connection.execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {NOT_EXPIRED}',
+            (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение живёт всё время работы потока, как и у LocMemCache
+        pass
+
+    # Вытеснение
+
+    def _maybe_cull(self, written):
+        with _writes_lock:
+            _writes[self._path] += written
+            if _writes[self._path] < self._cull_check_interval:
+                return
+            _writes[self._path] = 0
+        self._cull()
+
+    def _size(self, connection):
+        return connection.execute(
+            'SELECT entries FROM cache_size'
+        ).fetchone()[0]
+
+    def _cull(self):
+        with self._transaction() as connection:
+            connection.execute(
+                f'DELETE FROM cache WHERE NOT {NOT_EXPIRED}', (time.time(),)
+            )
+            count = self._size(connection)
+            if count <= self._max_entries:
+                return
+            if not self._cull_frequency:
+                connection.execute('DELETE FROM cache')
+                return
+            excess = count - self._max_entries
+            excess += self._max_entries // self._cull_frequency
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (excess,)
+            )
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT: писатели сериализуются сразу."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
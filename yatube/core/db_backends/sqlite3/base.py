@@ -0,0 +1,100 @@
+"""
+Бэкенд SQLite, настроенный для работы под нагрузкой.
+
+При открытии соединения включаются WAL (читатели не блокируют
+писателя и наоборот), synchronous=NORMAL, ожидание блокировки
+вместо немедленного «database is locked», mmap и кэш страниц.
+Транзакции основной базы (default) начинаются с BEGIN IMMEDIATE:
+блокировка записи берётся сразу, а не при первом INSERT, поэтому
+параллельные писатели ждут в busy_timeout, а не падают при повышении
+блокировки. Реплики и другие базы только читают, там транзакции
+DEFERRED — читатели не выстраиваются в очередь за писателями. Вместе
+с CONN_MAX_AGE соединения переиспользуются между запросами;
+перед повторным использованием они проверяются запросом SELECT 1.
+
+Пример настройки:
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db_backends.sqlite3',
+            'NAME': '/var/lib/yatube/db.sqlite3',
+            'CONN_MAX_AGE': 600,
+            'OPTIONS': {'MMAP_SIZE': 256 * 2 ** 20},
+        }
+    }
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.sqlite3 import base
+
+# Дополнительные OPTIONS и значения по умолчанию:
+#   JOURNAL_MODE, SYNCHRONOUS, BUSY_TIMEOUT (мс), MMAP_SIZE (байты),
+#   CACHE_SIZE (отрицательное — в КиБ) — одноимённые PRAGMA, None
+#   оставляет значение SQLite;
+#   TRANSACTION_MODE — DEFERRED, IMMEDIATE или EXCLUSIVE (по умолчанию
+#   IMMEDIATE у default и DEFERRED у остальных баз);
+#   HEALTH_CHECKS — проверять переиспользуемое соединение.
+PRAGMAS = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT': 5000,
+    'MMAP_SIZE': 64 * 2 ** 20,
+    'CACHE_SIZE': -16000,
+}
+DEFAULTS = {
+    **PRAGMAS,
+    'TRANSACTION_MODE': 'IMMEDIATE',
+    'HEALTH_CHECKS': True,
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def apply_pragmas(connection, options):
+    """Выполняет PRAGMA из options поверх значений по умолчанию."""
+    for name, default in PRAGMAS.items():
+        value = options.get(name, default)
+        if value is not None:
+            connection.execute(f'PRAGMA {name.lower()} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def tuning(self, name):
+        default = DEFAULTS[name]
+        if name == 'TRANSACTION_MODE' and self.alias != DEFAULT_DB_ALIAS:
+            default = 'DEFERRED'
+        return self.settings_dict['OPTIONS'].get(name, default)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for name in DEFAULTS:
+            params.pop(name, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.settings_dict['OPTIONS'])
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.tuning('TRANSACTION_MODE').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ValueError(f'Неизвестный TRANSACTION_MODE: {mode}')
+        self.cursor().execute(f'BEGIN {mode}')
+
+    def is_usable(self):
+        try:
+            self.connection.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
+
+    def close_if_unusable_or_obsolete(self):
+        # Django 2.2 проверяет соединение только после ошибок, поэтому
+        # сломанное постоянное соединение проверяется здесь
+        if (self.connection is not None
+                and not self.in_atomic_block
+                and self.tuning('HEALTH_CHECKS')
+                and not self.is_usable()):
+            self.close()
+            return
+        super().close_if_unusable_or_obsolete()
@@ -0,0 +1,78 @@
+"""
+Разделение чтения и записи между основной базой и репликами.
+
+Запись всегда идёт в основную базу. ReplicaMiddleware выбирает
+для запроса GET/HEAD одну случайную реплику из DATABASE_REPLICAS,
+и все чтения запроса идут на неё — данные не «прыгают» между
+репликами с разной задержкой. Фоновые задачи, команды и всё,
+что выполняется вне запроса, читают основную базу.
+
+Если запрос сам что-то записал (например, подтянул записи ленты),
+он до конца читает основную базу. Закрепление клиента за основной
+базой (read-your-writes) зависит только от метода: ответ на POST
+и другие небезопасные запросы ставит cookie, по которой следующие
+запросы клиента REPLICA_STICKY_SECONDS секунд идут в основную базу.
+Попутные записи при чтении cookie не ставят. Задержка реплик
+(см. команду sync_replicas) должна быть меньше.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+STICKY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def use_replica(alias):
+    """Реплика для чтений текущего запроса; None — основная база."""
+    _state.replica = alias
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'replica', None) or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        # После записи запрос до конца читает основную базу
+        _state.replica = None
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными из основной базы
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """Выбирает реплику на запрос и закрепляет писавших за основной базой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        aliases = replicas()
+        safe = request.method in SAFE_METHODS
+        if aliases and safe and STICKY_COOKIE not in request.COOKIES:
+            use_replica(random.choice(aliases))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica(None)
+        if aliases and not safe:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,68 @@
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import percentile
+from core.cache_backends.sqlite import SQLiteCache
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку попаданий и записей LocMemCache, '
+        'FileBasedCache и SQLiteCache'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument(
+            '--value-size', type=int, default=2048,
+            help='Размер значения в байтах (≈ фрагмент ленты)'
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        params = {'OPTIONS': {'MAX_ENTRIES': options['keys'] * 2}}
+        backends = {
+            'locmem': LocMemCache('bench', params),
+            'filebased': FileBasedCache(f'{directory}/files', params),
+            'sqlite': SQLiteCache(f'{directory}/cache.sqlite3', params),
+        }
+        try:
+            self.stdout.write(
+                f'{"backend":<10} {"get p50":>9} {"get p95":>9} '
+                f'{"set p50":>9} {"set p95":>9}  (мкс)'
+            )
+            for name, cache in backends.items():
+                gets, sets = self.measure(cache, options)
+                self.stdout.write(
+                    f'{name:<10} '
+                    f'{statistics.median(gets):9.1f} '
+                    f'{percentile(gets, 0.95):9.1f} '
+                    f'{statistics.median(sets):9.1f} '
+                    f'{percentile(sets, 0.95):9.1f}'
+                )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @staticmethod
+    def measure(cache, options):
+        keys = [f'fragment:{i}' for i in range(options['keys'])]
+        value = 'x' * options['value_size']
+        sets = []
+        for key in keys:
+            started = time.perf_counter()
+            cache.set(key, value)
+            sets.append((time.perf_counter() - started) * 1e6)
+        gets = []
+        for i in range(options['iterations']):
+            key = keys[i % len(keys)]
+            started = time.perf_counter()
+            cache.get(key)
+            gets.append((time.perf_counter() - started) * 1e6)
+        return gets, sets
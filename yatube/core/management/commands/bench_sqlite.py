@@ -0,0 +1,162 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.db_backends.sqlite3.base import DEFAULTS, apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    ' id INTEGER PRIMARY KEY,'
+    ' author_id INTEGER NOT NULL,'
+    ' text TEXT NOT NULL,'
+    ' pub_date REAL NOT NULL'
+    ')',
+    'CREATE INDEX post_author_date ON post (author_id, pub_date DESC)',
+)
+AUTHORS = 100
+
+# Настройки SQLite по умолчанию: журнал отката, synchronous=FULL,
+# отложенные транзакции и новое соединение на каждый запрос
+PROFILES = {
+    'default': {
+        'pragmas': {name: None for name in DEFAULTS},
+        'transaction_mode': 'DEFERRED',
+        'persistent': False,
+    },
+    'tuned': {
+        'pragmas': {},
+        'transaction_mode': DEFAULTS['TRANSACTION_MODE'],
+        'persistent': True,
+    },
+}
+
+
+class Worker(threading.Thread):
+    """Выполняет операции, пока не истечёт время, и считает их."""
+
+    def __init__(self, path, profile, deadline, write):
+        super().__init__()
+        self.path = path
+        self.profile = profile
+        self.deadline = deadline
+        self.write = write
+        self.done = 0
+        self.locked = 0
+        self.connection = None
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        apply_pragmas(connection, self.profile['pragmas'])
+        return connection
+
+    def run(self):
+        author = self.ident % AUTHORS
+        while time.monotonic() < self.deadline:
+            if self.connection is None:
+                self.connection = self.connect()
+            try:
+                if self.write:
+                    self.create_post(author)
+                else:
+                    self.read_feed(author)
+                self.done += 1
+            except sqlite3.OperationalError:
+                self.locked += 1
+                if self.connection.in_transaction:
+                    self.connection.execute('ROLLBACK')
+            if not self.profile['persistent']:
+                self.connection.close()
+                self.connection = None
+        if self.connection is not None:
+            self.connection.close()
+
+    def read_feed(self, author):
+        self.connection.execute(
+            'SELECT id, text FROM post WHERE author_id = ? '
+            'ORDER BY pub_date DESC LIMIT 10', (author,)
+        ).fetchall()
+
+    def create_post(self, author):
+        # Как post_create: чтение и запись в одной транзакции
+        self.connection.execute(
+            f'BEGIN {self.profile["transaction_mode"]}'
+        )
+        self.connection.execute(
+            'SELECT COUNT(*) FROM post WHERE author_id = ?', (author,)
+        ).fetchone()
+        self.connection.execute(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            (author, 'x' * 200, time.time())
+        )
+        self.connection.execute('COMMIT')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при параллельных '
+        'чтениях и записях с настройками по умолчанию и с настройками '
+        'бэкенда core.db_backends.sqlite3'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            self.stdout.write(
+                f'{"profile":<8} {"reads/s":>9} {"writes/s":>9} '
+                f'{"locked":>7}'
+            )
+            for name, profile in PROFILES.items():
+                path = os.path.join(directory, f'{name}.sqlite3')
+                self.prepare(path, profile, options['rows'])
+                reads, writes, locked = self.measure(path, profile, options)
+                self.stdout.write(
+                    f'{name:<8} {reads:9.0f} {writes:9.0f} {locked:7d}'
+                )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @staticmethod
+    def prepare(path, profile, rows):
+        connection = sqlite3.connect(path, isolation_level=None)
+        apply_pragmas(connection, profile['pragmas'])
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            ((i % AUTHORS, 'x' * 200, i) for i in range(rows))
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    @staticmethod
+    def measure(path, profile, options):
+        deadline = time.monotonic() + options['seconds']
+        workers = [
+            Worker(path, profile, deadline, write=False)
+            for _ in range(options['readers'])
+        ] + [
+            Worker(path, profile, deadline, write=True)
+            for _ in range(options['writers'])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds = options['seconds']
+        return (
+            sum(w.done for w in workers if not w.write) / seconds,
+            sum(w.done for w in workers if w.write) / seconds,
+            sum(w.locked for w in workers),
+        )
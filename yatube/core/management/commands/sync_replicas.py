@@ -0,0 +1,47 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def copy_database(source, target):
+    """
+    Копирует базу SQLite через backup API. Копия пишется поверх файла
+    реплики на месте, поэтому открытые соединения реплики видят новые
+    данные, а читатели лишь ждут окончания копирования.
+    """
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target, timeout=30)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS. '
+        'С --interval повторяет копирование, пока не будет остановлена.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Пауза между синхронизациями в секундах'
+        )
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']['NAME']
+        while True:
+            started = time.monotonic()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(source, settings.DATABASES[alias]['NAME'])
+            self.stdout.write(
+                f'Реплик синхронизировано: {len(settings.DATABASE_REPLICAS)} '
+                f'за {time.monotonic() - started:.2f} с'
+            )
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,79 @@
+"""
+Кэш целых страниц для анонимных посетителей и условные GET.
+
+Представление оборачивается декоратором anonymous_page_cache(state),
+где state(request, *args, **kwargs) дёшево (без рендера) возвращает
+пару (basis, last_modified) или None, если объекта нет:
+    basis — строка, меняющаяся при любом изменении содержимого
+        страницы (обычно версии областей кэша);
+    last_modified — время последнего изменения (datetime или None);
+        должно сдвигаться при любой смене basis, иначе запрос
+        с одним If-Modified-Since получит 304 на устаревшую страницу.
+
+ETag строится из адреса страницы и basis. Если он совпал с
+If-None-Match клиента (или не прошло If-Modified-Since), ответ — 304
+без рендера. Иначе готовая страница берётся из кэша по ETag, а при
+промахе рендерится и сохраняется. Старые копии не удаляются явно:
+с новой версией меняется ETag, и они просто вытесняются.
+
+Авторизованные пользователи видят свои кнопки и формы, поэтому их
+запросы идут мимо кэша.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+KEY_PREFIX = 'core:page'
+
+
+def _digest(request, basis):
+    return hashlib.md5(
+        f'{request.get_full_path()}|{basis}'.encode()
+    ).hexdigest()
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Хранить можно, но перед показом надо переспросить сервер
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def anonymous_page_cache(state):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            page_state = state(request, *args, **kwargs)
+            if page_state is None:
+                return view(request, *args, **kwargs)
+            basis, last_modified = page_state
+            if last_modified is not None:
+                last_modified = timegm(last_modified.utctimetuple())
+            digest = _digest(request, basis)
+            etag = quote_etag(digest)
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                return _set_validators(response, etag, last_modified)
+
+            key = f'{KEY_PREFIX}:{digest}'
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies:
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            return _set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
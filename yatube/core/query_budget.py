@@ -0,0 +1,68 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('yatube.query_budget')
+
+
+def query_budget(limit):
+    """
+    Задаёт для view максимальное число SQL-запросов на один ответ.
+    Бюджет проверяется в тестах и, если включён QUERY_BUDGET_LOG,
+    логируется в QueryBudgetMiddleware.
+    """
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    return getattr(view_func, 'query_budget', None)
+
+
+class QueryCounter:
+    """Обёртка для connection.execute_wrapper: число и время запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class QueryBudgetMiddleware:
+    """Пишет предупреждение, если view вышла за свой бюджет запросов."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_LOG', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        # Считаются запросы и к основной базе, и к репликам
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                'Превышен бюджет запросов: %s %s — %d из %d',
+                request.method, request.path, counter.count, budget
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
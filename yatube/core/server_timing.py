@@ -0,0 +1,234 @@
+"""
+Замеры отдельных запросов: заголовок Server-Timing и строка в логе.
+
+ServerTimingMiddleware замеряет долю SERVER_TIMING_SAMPLE_RATE
+запросов: время и число SQL-запросов ко всем базам, время рендера
+шаблонов, обращения к кэшу (время, попадания и промахи) и работу
+с миниатюрами. Итог отдаётся в заголовке Server-Timing (его видно
+в инструментах разработчика браузера), если включён
+SERVER_TIMING_HEADER, и пишется JSON-строкой в лог yatube.server_timing.
+
+Рендер шаблонов и методы кэша оборачиваются один раз, при первом
+замере (collect). Обёртки смотрят на замер текущего запроса в ContextVar
+и без него сразу вызывают исходный метод; при нулевой доле
+middleware не подключается вовсе и ничего не оборачивает.
+Вложенные вызовы (include, get_many через get) не суммируются.
+collect() используют и бенчмарки views (posts.benchmarks).
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+from .query_budget import QueryCounter
+
+logger = logging.getLogger('yatube.server_timing')
+
+_current = ContextVar('server_timing', default=None)
+_MISSING = object()
+_installed = False
+
+
+class Timing:
+    """Время и число вызовов по видам работы в одном запросе."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.counts = Counter()
+        self.active = set()
+        self.queries = QueryCounter()
+
+    @contextmanager
+    def measure(self, name):
+        if name in self.active:
+            yield
+            return
+        self.active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - started
+            self.counts[name] += 1
+            self.active.discard(name)
+
+    def ms(self, name):
+        if name == 'db':
+            return round(self.queries.seconds * 1000, 3)
+        return round(self.seconds[name] * 1000, 3)
+
+    def header(self, total):
+        counts = self.counts
+        metrics = []
+        if self.queries.count:
+            metrics.append(
+                f'db;dur={self.ms("db")};desc="queries={self.queries.count}"'
+            )
+        if counts['tpl']:
+            metrics.append(f'tpl;dur={self.ms("tpl")}')
+        if counts['cache']:
+            metrics.append(
+                f'cache;dur={self.ms("cache")};'
+                f'desc="hits={counts["cache_hit"]} '
+                f'misses={counts["cache_miss"]}"'
+            )
+        if counts['thumb'] or counts['thumb_queued']:
+            metrics.append(
+                f'thumb;dur={self.ms("thumb")};'
+                f'desc="queued={counts["thumb_queued"]}"'
+            )
+        metrics.append(f'total;dur={round(total * 1000, 3)}')
+        return ', '.join(metrics)
+
+    def record(self, request, response, total):
+        match = getattr(request, 'resolver_match', None)
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            'db_ms': self.ms('db'),
+            'db_queries': self.queries.count,
+            'template_ms': self.ms('tpl'),
+            'cache_ms': self.ms('cache'),
+            'cache_hits': self.counts['cache_hit'],
+            'cache_misses': self.counts['cache_miss'],
+            'thumbnail_ms': self.ms('thumb'),
+            'thumbnails_queued': self.counts['thumb_queued'],
+        }
+
+
+@contextmanager
+def collect():
+    """
+    Замеряет блок кода как один запрос: SQL ко всем базам, шаблоны,
+    кэш и миниатюры. Возвращает Timing.
+    """
+    install()
+    timing = Timing()
+    token = _current.set(timing)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timing.queries)
+                )
+            yield timing
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def measure(name):
+    """Засекает блок кода, если текущий запрос замеряется."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    with timing.measure(name):
+        yield
+
+
+def count(name, number=1):
+    timing = _current.get()
+    if timing is not None:
+        timing.counts[name] += number
+
+
+def _wrap_render(render):
+    @wraps(render)
+    def wrapper(self, context):
+        timing = _current.get()
+        if timing is None:
+            return render(self, context)
+        with timing.measure('tpl'):
+            return render(self, context)
+    return wrapper
+
+
+def _wrap_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        timing = _current.get()
+        if timing is None or 'cache' in timing.active:
+            return get(self, key, default, version)
+        with timing.measure('cache'):
+            value = get(self, key, _MISSING, version)
+        if value is _MISSING:
+            timing.counts['cache_miss'] += 1
+            return default
+        timing.counts['cache_hit'] += 1
+        return value
+    return wrapper
+
+
+def _wrap_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, version=None):
+        timing = _current.get()
+        if timing is None or 'cache' in timing.active:
+            return get_many(self, keys, version)
+        keys = list(keys)
+        with timing.measure('cache'):
+            values = get_many(self, keys, version)
+        timing.counts['cache_hit'] += len(values)
+        timing.counts['cache_miss'] += len(keys) - len(values)
+        return values
+    return wrapper
+
+
+def _patch(cls, name, wrap):
+    method = getattr(cls, name)
+    if not getattr(method, 'server_timing', False):
+        method = wrap(method)
+        method.server_timing = True
+        setattr(cls, name, method)
+
+
+def install():
+    """Оборачивает рендер шаблонов и чтение из всех кэшей (один раз)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    _patch(Template, 'render', _wrap_render)
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        _patch(backend, 'get', _wrap_get)
+        _patch(backend, 'get_many', _wrap_get_many)
+
+
+class ServerTimingMiddleware:
+    """Замеряет выборку запросов и отдаёт итог в Server-Timing и в лог."""
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with collect() as timing:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timing.header(total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(
+                timing.record(request, response, total), ensure_ascii=False
+            ))
+        return response
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from . import workers
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Фоновые задачи в тестах выполняются сразу, в потоке теста, — так
+    их результат детерминирован и не переживает тест.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        workers.shutdown()
+        settings.BACKGROUND_WORKERS = 0
+
+    def teardown_test_environment(self, **kwargs):
+        workers.shutdown()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from core.cache_backends.sqlite import SQLiteCache
+
+
+def make_cache(path, **options):
+    return SQLiteCache(path, {'OPTIONS': options})
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = make_cache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_set_get_delete(self):
+        self.cache.set('post', {'text': 'Пост'})
+        self.assertEqual(self.cache.get('post'), {'text': 'Пост'})
+        self.assertTrue(self.cache.has_key('post'))
+
+        self.cache.delete('post')
+        self.assertIsNone(self.cache.get('post'))
+        self.assertEqual(self.cache.get('post', 'нет'), 'нет')
+
+    def test_many(self):
+        self.cache.set_many({'a': 1, 'b': 'два'})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 'два'}
+        )
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+
+    def test_add_and_expiry(self):
+        self.assertTrue(self.cache.add('key', 'первое', 0.05))
+        self.assertFalse(self.cache.add('key', 'второе'))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'третье'))
+        self.assertEqual(self.cache.get('key'), 'третье')
+
+    def test_incr(self):
+        self.cache.set('counter', 10)
+        self.assertEqual(self.cache.incr('counter'), 11)
+        self.assertEqual(self.cache.decr('counter', 5), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_visible_across_instances(self):
+        """Запись одного воркера сразу видна другому."""
+        other = make_cache(self.path)
+        self.cache.set('version', 1, None)
+        other.incr('version')
+        self.assertEqual(self.cache.get('version'), 2)
+        other.clear()
+        self.assertIsNone(self.cache.get('version'))
+
+    def test_concurrent_incr_is_atomic(self):
+        self.cache.set('counter', 0, None)
+
+        def worker():
+            for _ in range(50):
+                self.cache.incr('counter')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+
+    def test_cull_evicts_least_recently_used(self):
+        cache = make_cache(
+            self.path, MAX_ENTRIES=10, CULL_FREQUENCY=2,
+            CULL_CHECK_INTERVAL=1, ACCESS_RESOLUTION=0
+        )
+        for i in range(10):
+            cache.set(f'key{i}', i)
+        time.sleep(0.01)
+        cache.get('key0')
+        cache.set('key10', 10)
+
+        self.assertEqual(cache.get('key0'), 0)
+        self.assertIsNone(cache.get('key1'))
+        self.assertEqual(cache.get('key10'), 10)
+
+    def test_size_is_tracked_without_count(self):
+        cache = make_cache(self.path)
+        cache.set_many({f'key{i}': i for i in range(5)})
+        cache.set('key0', 'заново')
+        self.assertTrue(cache.add('extra', 1))
+        self.assertFalse(cache.add('extra', 2))
+        cache.delete('key1')
+        cache.delete_many(['key2', 'missing'])
+        connection = cache._connection
+        self.assertEqual(
+            cache._size(connection),
+            connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        )
+        cache.clear()
+        self.assertEqual(cache._size(connection), 0)
+
+    def test_cull_check_is_shared_by_threads(self):
+        """Экземпляры разных потоков считают записи вместе."""
+        options = {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 0,
+                   'CULL_CHECK_INTERVAL': 4}
+        caches = [make_cache(self.path, **options) for _ in range(4)]
+        for i, cache in enumerate(caches):
+            cache.set(f'key{i}', i)
+        self.assertFalse(caches[0].has_key('key3'))
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from core.db_backends.sqlite3.base import DatabaseWrapper
+
+
+class TunedSQLiteTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.wrapper = self.make_wrapper()
+
+    def tearDown(self):
+        self.wrapper.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_wrapper(self, alias='default', **options):
+        return DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': os.path.join(self.directory, 'db.sqlite3'),
+            'OPTIONS': options,
+        }, alias=alias)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -16000)
+        self.assertNotIn('MMAP_SIZE', self.wrapper.get_connection_params())
+
+    def test_options_override_defaults(self):
+        self.wrapper = self.make_wrapper(BUSY_TIMEOUT=100, JOURNAL_MODE=None)
+        self.assertEqual(self.pragma('busy_timeout'), 100)
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+
+    def test_transactions_take_write_lock_immediately(self):
+        executed = []
+        self.wrapper.ensure_connection()
+        self.wrapper.connection.set_trace_callback(executed.append)
+        self.wrapper._start_transaction_under_autocommit()
+        self.assertTrue(self.wrapper.connection.in_transaction)
+        self.wrapper.connection.execute('ROLLBACK')
+        self.assertEqual(executed[0], 'BEGIN IMMEDIATE')
+
+    def test_replicas_use_deferred_transactions(self):
+        self.wrapper = self.make_wrapper(alias='replica1')
+        executed = []
+        self.wrapper.ensure_connection()
+        self.wrapper.connection.set_trace_callback(executed.append)
+        self.wrapper._start_transaction_under_autocommit()
+        self.wrapper.connection.execute('ROLLBACK')
+        self.assertEqual(executed[0], 'BEGIN DEFERRED')
+
+    def test_broken_connection_is_replaced(self):
+        self.wrapper.ensure_connection()
+        self.assertTrue(self.wrapper.is_usable())
+        self.wrapper.connection.close()
+        self.assertFalse(self.wrapper.is_usable())
+        self.wrapper.close_if_unusable_or_obsolete()
+        self.assertIsNone(self.wrapper.connection)
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command(
+            'bench_sqlite', seconds=0.2, readers=2, writers=1, rows=100,
+            stdout=out
+        )
+        self.assertIn('tuned', out.getvalue())
@@ -0,0 +1,111 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db_routers import (
+    STICKY_COOKIE, PrimaryReplicaRouter, ReplicaMiddleware
+)
+from core.management.commands.sync_replicas import copy_database
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def handle(self, request, write=False):
+        """Прогоняет запрос через middleware и запоминает базы чтения."""
+        used = []
+
+        def view(request):
+            used.append(self.router.db_for_read(None))
+            if write:
+                self.router.db_for_write(None)
+                used.append(self.router.db_for_read(None))
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(request)
+        return used, response
+
+    def test_reads_go_to_replicas(self):
+        used, response = self.handle(self.factory.get('/'))
+        self.assertEqual(used, ['replica1'])
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_reads_after_write_go_to_primary(self):
+        # Попутная запись при чтении не закрепляет клиента
+        used, response = self.handle(self.factory.get('/'), write=True)
+        self.assertEqual(used, ['replica1', 'default'])
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_unsafe_requests_pin_client_to_primary(self):
+        _, response = self.handle(self.factory.post('/'), write=True)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        used, _ = self.handle(request)
+        self.assertEqual(used, ['default'])
+
+    def test_unsafe_requests_and_background_use_primary(self):
+        used, _ = self.handle(self.factory.post('/'))
+        self.assertEqual(used, ['default'])
+        self.assertEqual(self.router.db_for_read(None), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+    def test_one_replica_per_request(self):
+        used = []
+
+        def view(request):
+            used.append({self.router.db_for_read(None) for _ in range(20)})
+            return HttpResponse()
+
+        for _ in range(5):
+            ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertTrue(all(len(aliases) == 1 for aliases in used))
+
+    def test_migrations_skip_replicas(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        used, response = self.handle(self.factory.post('/'), write=True)
+        self.assertEqual(used, ['default', 'default'])
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+
+class CopyDatabaseTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'db.sqlite3')
+        self.replica = os.path.join(self.directory, 'replica.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_open_replica_sees_new_data(self):
+        primary = sqlite3.connect(self.source, isolation_level=None)
+        primary.execute('PRAGMA journal_mode=WAL')
+        primary.execute('CREATE TABLE post (text TEXT)')
+        primary.execute("INSERT INTO post VALUES ('первый')")
+        copy_database(self.source, self.replica)
+
+        replica = sqlite3.connect(self.replica)
+        self.assertEqual(
+            replica.execute('SELECT COUNT(*) FROM post').fetchone(), (1,)
+        )
+        primary.execute("INSERT INTO post VALUES ('второй')")
+        copy_database(self.source, self.replica)
+        self.assertEqual(
+            replica.execute('SELECT COUNT(*) FROM post').fetchone(), (2,)
+        )
+        replica.close()
+        primary.close()
@@ -0,0 +1,66 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post  # isort:skip
+
+User = get_user_model()
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_HEADER=True)
+class ServerTimingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def metrics(self, response):
+        return {
+            metric.split(';')[0]: metric
+            for metric in response['Server-Timing'].split(', ')
+        }
+
+    def test_header_and_log(self):
+        with self.assertLogs('yatube.server_timing', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            set(self.metrics(response)), {'db', 'tpl', 'cache', 'total'}
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+
+    def test_cache_hits_and_misses(self):
+        url = reverse('posts:index')
+        with self.assertLogs('yatube.server_timing', 'INFO') as logs:
+            self.client.get(url)
+            self.client.get(url)
+        first, second = (
+            json.loads(record.getMessage()) for record in logs.records
+        )
+        self.assertGreater(first['cache_misses'], 0)
+        self.assertGreater(second['cache_hits'], 0)
+        # Страница взята из кэша: ни рендера, ни запросов к постам
+        self.assertEqual(second['template_ms'], 0)
+        self.assertLess(second['db_queries'], first['db_queries'])
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        with self.assertLogs('yatube.server_timing', 'INFO'):
+            response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_disabled(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,45 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from core import workers
+
+
+class WorkersTests(SimpleTestCase):
+
+    def tearDown(self):
+        workers.shutdown()
+
+    @override_settings(BACKGROUND_WORKERS=0)
+    def test_inline_without_workers(self):
+        done = []
+        workers.submit(done.append, threading.current_thread())
+        self.assertEqual(done, [threading.current_thread()])
+
+    @override_settings(BACKGROUND_WORKERS=2)
+    def test_drain_waits_for_pool_jobs(self):
+        started = threading.Event()
+        release = threading.Event()
+        done = []
+
+        def job(value):
+            started.set()
+            release.wait(5)
+            done.append(value)
+
+        workers.submit(job, 1)
+        started.wait(5)
+        self.assertEqual(done, [])
+        release.set()
+        workers.drain()
+        self.assertEqual(done, [1])
+
+    @override_settings(BACKGROUND_WORKERS=1)
+    def test_shutdown_waits_and_pool_restarts(self):
+        done = []
+        workers.submit(done.append, 1)
+        workers.shutdown()
+        self.assertEqual(done, [1])
+        workers.submit(done.append, 2)
+        workers.drain()
+        self.assertEqual(done, [1, 2])
@@ -0,0 +1,76 @@
+"""
+Общий пул потоков для фоновых задач: обработки картинок, миниатюр.
+
+BACKGROUND_WORKERS задаёт число потоков; 0 — выполнять задачу сразу
+в вызывающем потоке (удобно для отладки, так же работают тесты —
+см. core.test_runner). drain() дожидается поставленных задач,
+shutdown() останавливает пул; он вызывается и при выходе из процесса.
+"""
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_futures = set()
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_WORKERS,
+                thread_name_prefix='yatube-worker',
+            )
+        return _executor
+
+
+def _run(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+    finally:
+        # Соединения с БД открыты в потоке пула — закрываем их там же
+        connections.close_all()
+
+
+def _done(future):
+    with _lock:
+        _futures.discard(future)
+
+
+def submit(func, *args):
+    if not settings.BACKGROUND_WORKERS:
+        func(*args)
+        return
+    future = _get_executor().submit(_run, func, *args)
+    with _lock:
+        _futures.add(future)
+    future.add_done_callback(_done)
+
+
+def drain(timeout=None):
+    """Ждёт завершения задач, поставленных к этому моменту."""
+    with _lock:
+        pending = list(_futures)
+    wait(pending, timeout)
+
+
+def shutdown(wait=True):
+    """Останавливает пул; следующая задача создаст новый."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown)
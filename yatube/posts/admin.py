@@ -1,15 +1,114 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Q
 
+from . import search
 from .models import Comment, Follow, Group, Post
+from .paginators import EstimatedCountPaginator
 
 
-class PostAdmin(admin.ModelAdmin):
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """
+    Автодополнение, которому выбранный объект можно передать готовым:
+    тогда подпись не запрашивается отдельно для каждой строки списка.
+    """
+    objects = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.objects is None:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        selected = {str(item) for item in value}
+        for obj in self.objects:
+            if str(obj.pk) in selected:
+                label = self.choices.field.label_from_instance(obj)
+                options.append(self.create_option(
+                    name, obj.pk, label, True, len(options)
+                ))
+        return [(None, options, 0)]
+
+
+class PreloadedChangelistForm(forms.ModelForm):
+    """Форма строки list_editable: связи уже загружены select_related."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, PreloadedAutocompleteSelect):
+                related = getattr(self.instance, name, None)
+                widget.objects = [related] if related is not None else []
+
+
+class EstimatedChangeList(ChangeList):
+    """
+    Список, число строк которого берётся у паджинатора после выбора
+    страницы: validate_number уточняет завышенную оценку.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_count = self.paginator.count
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Список без полного COUNT(*): число строк оценивается паджинатором
+    (templates/admin/pagination.html показывает его count_display),
+    а «всего N» над результатами поиска не показывается.
+    Поиск — точное совпадение с одним из search_fields, чтобы
+    работал индекс, а не LIKE '%...%' по всей таблице.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedChangeList
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', PreloadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PreloadedChangelistForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = Q()
+        for field in self.get_search_fields(request):
+            query |= Q(**{field: search_term})
+        return queryset.filter(query), False
+
+
+class PostAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
+    # Вместо <select> со всеми группами и авторами в каждой строке
+    autocomplete_fields = ('author', 'group')
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу FTS5 вместо LIKE '%...%' по всей таблице
+        if not search_term:
+            return queryset, False
+        return search.search(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'description',)
@@ -17,15 +116,19 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'author', 'created',)
-    search_fields = ('author', 'created',)
+    list_select_related = ('author',)
+    search_fields = ('author__username',)
+    autocomplete_fields = ('post', 'author')
     empty_value_display = '-пусто-'
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = ('pk', 'user', 'author',)
-    search_fields = ('author', 'user',)
+    list_select_related = ('user', 'author')
+    search_fields = ('author__username', 'user__username')
+    autocomplete_fields = ('user', 'author')
     empty_value_display = '-пусто-'
 
 
@@ -0,0 +1,261 @@
+"""
+Замеры views на синтетических наборах данных разного размера.
+
+Каждый сценарий из CASES проходит через Client со всеми middleware:
+считаются задержка (p50/p95), число и время SQL-запросов и время
+рендера шаблонов (в него входят и запросы, выполненные при рендере) —
+через core.server_timing.collect().
+Кэш страниц и фрагментов отключён, чтобы замерять работу view,
+а не попадания в кэш. Сценарии с записью выполняются в транзакции,
+которая затем откатывается, поэтому набор данных можно переиспользовать.
+Результаты — JSON, который сравнивается с сохранённым базовым замером.
+"""
+import platform
+import sqlite3
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from core import server_timing
+from core.benchmarks import NO_CACHE, percentile
+
+from . import importer, synthetic
+from .models import Group, Post, User
+
+SCALES = {
+    'small': {
+        'users': 100, 'groups': 5, 'posts': 1000, 'comments': 2000,
+        'follows_per_user': 10,
+    },
+    'medium': {
+        'users': 1000, 'groups': 20, 'posts': 20000, 'comments': 50000,
+        'follows_per_user': 10,
+    },
+    'large': {
+        'users': 5000, 'groups': 50, 'posts': 200000, 'comments': 400000,
+        'follows_per_user': 10,
+    },
+}
+
+
+class Case:
+    """Сценарий: запрос к одной view от гостя или от читателя."""
+
+    def __init__(self, name, url, method='get', login=False, data=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.login = login
+        self.data = data
+
+
+CASES = (
+    # posts
+    Case('posts:index', lambda t: reverse('posts:index')),
+    Case('posts:group_list', lambda t: reverse(
+        'posts:group_list', args=(t['group'].slug,)
+    )),
+    Case('posts:profile', lambda t: reverse(
+        'posts:profile', args=(t['author'].username,)
+    )),
+    Case('posts:post_detail', lambda t: reverse(
+        'posts:post_detail', args=(t['post'].pk,)
+    )),
+    Case('posts:post_comments', lambda t: reverse(
+        'posts:post_comments', args=(t['post'].pk,)
+    )),
+    Case('posts:search', lambda t: '{}?{}'.format(
+        reverse('posts:search'), urlencode({'q': t['query']})
+    )),
+    Case('posts:follow_index', lambda t: reverse('posts:follow_index'),
+         login=True),
+    Case('posts:post_create', lambda t: reverse('posts:post_create'),
+         login=True),
+    Case('posts:post_edit', lambda t: reverse(
+        'posts:post_edit', args=(t['own_post'].pk,)
+    ), login=True),
+    Case('posts:add_comment', lambda t: reverse(
+        'posts:add_comment', args=(t['post'].pk,)
+    ), method='post', login=True, data={'text': 'Комментарий'}),
+    Case('posts:profile_follow', lambda t: reverse(
+        'posts:profile_follow', args=(t['author'].username,)
+    ), login=True),
+    Case('posts:profile_unfollow', lambda t: reverse(
+        'posts:profile_unfollow', args=(t['author'].username,)
+    ), login=True),
+    # users
+    Case('users:signup', lambda t: reverse('users:signup')),
+    Case('users:login', lambda t: reverse('users:login')),
+    Case('users:password_change', lambda t: reverse(
+        'users:password_change'
+    ), login=True),
+    Case('users:password_change_done', lambda t: reverse(
+        'users:password_change_done'
+    ), login=True),
+    Case('users:password_reset', lambda t: reverse('users:password_reset')),
+    Case('users:password_reset_done', lambda t: reverse(
+        'users:password_reset_done'
+    )),
+    Case('users:password_reset_confirm', lambda t: reverse(
+        'users:password_reset_confirm', args=('MQ', 'invalid-token')
+    )),
+    Case('users:password_reset_complete', lambda t: reverse(
+        'users:password_reset_complete'
+    )),
+    # about
+    Case('about:author', lambda t: reverse('about:author')),
+    Case('about:tech', lambda t: reverse('about:tech')),
+    # Последним: выход завершает сессию читателя
+    Case('users:logout', lambda t: reverse('users:logout'), login=True),
+)
+
+
+def populate(scale, seed):
+    """Заполняет пустую базу набором размера scale."""
+    generator = synthetic.Generator(seed=seed, until=timezone.now())
+    sizes = SCALES[scale]
+    generator.users(sizes['users'])
+    generator.groups(sizes['groups'])
+    generator.posts(sizes['posts'])
+    generator.comments(sizes['comments'])
+    generator.follows(sizes['follows_per_user'])
+    importer.rebuild()
+
+
+def targets():
+    """
+    Самые «тяжёлые» читатель ленты, автор, группа и пост;
+    None, если в базе нет постов с группами и подписок.
+    """
+    reader = User.objects.annotate(
+        total=Count('follower')
+    ).order_by('-total').first()
+    if reader is None:
+        return None
+    author = User.objects.exclude(pk=reader.pk).annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    group = Group.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    post = Post.objects.annotate(
+        total=Count('comments')
+    ).order_by('-total').first()
+    if None in (author, group, post):
+        return None
+    return {
+        'reader': reader,
+        'author': author,
+        'group': group,
+        'post': post,
+        'query': (post.text.split() or ['пост'])[0],
+    }
+
+
+def own_post(reader):
+    """Пост читателя для сценария правки."""
+    post = Post.objects.filter(author=reader).first()
+    if post is None:
+        post = Post.objects.create(text='Пост читателя', author=reader)
+    return post
+
+
+def measure(client, case, url, repeat, warmup):
+    request = getattr(client, case.method)
+    latencies, queries, sql, render = [], [], [], []
+    for iteration in range(warmup + repeat):
+        with server_timing.collect() as timing:
+            started = time.perf_counter()
+            response = request(url, case.data)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{case.name}: {url} ответил {response.status_code}'
+            )
+        if iteration < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(timing.queries.count)
+        sql.append(timing.ms('db'))
+        render.append(timing.ms('tpl'))
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'queries': max(queries),
+        'sql_ms': round(statistics.median(sql), 3),
+        'render_ms': round(statistics.median(render), 3),
+    }
+
+
+def run(repeat, warmup, names=None):
+    """
+    Замеряет сценарии на текущей базе; {имя сценария: метрики}.
+    Всё, что записали сценарии, откатывается.
+    """
+    with override_settings(
+        CACHES=NO_CACHE,
+        DATABASE_REPLICAS=[],
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        # Замеры собирает сам бенчмарк, а не middleware
+        SERVER_TIMING_SAMPLE_RATE=0,
+    ), transaction.atomic():
+        try:
+            found = targets()
+            if found is None:
+                raise RuntimeError('Нет данных для замера')
+            found['own_post'] = own_post(found['reader'])
+            guest, reader = Client(), Client()
+            reader.force_login(found['reader'])
+            return {
+                case.name: measure(
+                    reader if case.login else guest, case, case.url(found),
+                    repeat, warmup
+                )
+                for case in CASES if names is None or case.name in names
+            }
+        finally:
+            transaction.set_rollback(True)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Регрессии относительно baseline: больше запросов или медианная
+    задержка выросла больше чем на tolerance (доля) и на min_delta_ms.
+    p95 при десятках замеров слишком шумный и только записывается.
+    """
+    regressions = []
+    for scale, measured in results['scales'].items():
+        previous = baseline.get('scales', {}).get(scale, {}).get('cases', {})
+        for name, metrics in measured['cases'].items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            if metrics['queries'] > before['queries']:
+                regressions.append(
+                    f'{scale} {name}: запросов {before["queries"]} → '
+                    f'{metrics["queries"]}'
+                )
+            now, then = metrics['p50_ms'], before['p50_ms']
+            if now > then * (1 + tolerance) and now - then > min_delta_ms:
+                regressions.append(
+                    f'{scale} {name}: p50 {then:.2f} → {now:.2f} мс'
+                )
+    return regressions
@@ -0,0 +1,99 @@
+"""
+Поколения кэша для фрагментов лент.
+
+Версия области кэша входит в ключ фрагмента ({% cache %}), поэтому
+смена версии сигналом делает все старые фрагменты недостижимыми,
+и их можно хранить часами. Начальная версия берётся от времени,
+чтобы после вытеснения ключа версии не вернуть к жизни старые фрагменты.
+
+Области:
+    ('index',)              — главная страница;
+    ('group', group_id)     — посты группы;
+    ('author', author_id)   — посты автора и его имя;
+    ('user', user_id)       — только данные пользователя (имя);
+    ('follower', user_id)   — состав ленты подписок;
+    ('groups',)             — названия и адреса любых групп;
+    ('users',)              — данные любых пользователей;
+    ('post', post_id)       — сам пост и комментарии к нему;
+    ('stats', author_id)    — счётчики автора;
+    ('stats',)              — счётчики всех авторов (после сверки).
+
+Вместе с версией хранится время последней смены: из него
+get_state() получает Last-Modified страниц (core.page_cache).
+Пока время неизвестно (ключ вытеснен), им считается текущее —
+страница выглядит изменённой, а не устаревшей.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'posts:version'
+MODIFIED_PREFIX = 'posts:modified'
+
+
+def _key(scope, prefix=KEY_PREFIX):
+    return ':'.join([prefix, *map(str, scope)])
+
+
+def _init(key, value=None):
+    if value is None:
+        value = time.time_ns()
+    if not cache.add(key, value, None):
+        value = cache.get(key, value)
+    return value
+
+
+def get_version(*scope):
+    key = _key(scope)
+    version = cache.get(key)
+    if version is None:
+        version = _init(key)
+    return version
+
+
+def get_versions(scopes):
+    """Общая версия нескольких областей за один запрос к кэшу."""
+    keys = list(dict.fromkeys(_key(scope) for scope in scopes))
+    versions = cache.get_many(keys)
+    return '.'.join(
+        str(versions[key] if key in versions else _init(key))
+        for key in keys
+    )
+
+
+def get_state(scopes):
+    """
+    Общая версия нескольких областей и время последней смены любой
+    из них (datetime) — за одно обращение к кэшу.
+    """
+    scopes = list(dict.fromkeys(scopes))
+    keys = [_key(scope) for scope in scopes]
+    modified_keys = [_key(scope, MODIFIED_PREFIX) for scope in scopes]
+    values = cache.get_many(keys + modified_keys)
+    basis = '.'.join(
+        str(values[key] if key in values else _init(key)) for key in keys
+    )
+    modified = max(
+        values[key] if key in values else _init(key, time.time())
+        for key in modified_keys
+    )
+    return basis, datetime.fromtimestamp(modified, timezone.utc)
+
+
+def bump(*scope):
+    key = _key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(_key(scope, MODIFIED_PREFIX), time.time(), None)
+
+
+def bump_post(post, previous_group_id=None):
+    """Сбрасывает все ленты и страницы, где показан пост."""
+    bump('index')
+    bump('author', post.author_id)
+    bump('post', post.pk)
+    for group_id in {post.group_id, previous_group_id} - {None}:
+        bump('group', group_id)
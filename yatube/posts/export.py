@@ -0,0 +1,136 @@
+"""
+Потоковая выгрузка групп, постов, комментариев и подписок.
+
+Строки читаются порциями по возрастанию id (keyset, а не OFFSET):
+каждая порция — один запрос по первичному ключу, память не растёт
+с размером таблицы, а последний выгруженный id служит водяной
+меткой для следующей, инкрементальной выгрузки.
+"""
+import csv
+import gzip
+import json
+
+from django.core.files.storage import default_storage
+
+from .models import Comment, Follow, Group, Post
+
+CHUNK_SIZE = 2000
+
+# Имя таблицы → (модель, поле ответа → колонка values(), поле даты)
+TABLES = {
+    'group': (Group, {
+        'id': 'id',
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+    }, None),
+    'post': (Post, {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author_id': 'author_id',
+        'author': 'author__username',
+        'group_id': 'group_id',
+        'group': 'group__slug',
+        'image': 'image',
+    }, 'pub_date'),
+    'comment': (Comment, {
+        'id': 'id',
+        'post_id': 'post_id',
+        'author_id': 'author_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }, 'created'),
+    'follow': (Follow, {
+        'id': 'id',
+        'user_id': 'user_id',
+        'user': 'user__username',
+        'author_id': 'author_id',
+        'author': 'author__username',
+    }, None),
+}
+IMAGE_FIELDS = ('post_id', 'name', 'url', 'size')
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _chunks(queryset, columns, after_id, chunk_size):
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=after_id).order_by('id').values_list(
+                *columns
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1][0]
+
+
+def rows(table, since=None, after_id=0, chunk_size=CHUNK_SIZE):
+    """Строки таблицы словарями, по возрастанию id."""
+    model, fields, date_field = TABLES[table]
+    queryset = model.objects.all()
+    if since is not None and date_field is not None:
+        queryset = queryset.filter(**{f'{date_field}__gte': since})
+    names = list(fields)
+    for chunk in _chunks(
+        queryset, list(fields.values()), after_id, chunk_size
+    ):
+        for values in chunk:
+            yield dict(zip(names, map(_plain, values)))
+
+
+def image_rows(posts):
+    """Манифест картинок для выгруженных строк постов."""
+    for post in posts:
+        name = post['image']
+        if not name:
+            continue
+        try:
+            size = default_storage.size(name)
+        except OSError:
+            size = None
+        yield {
+            'post_id': post['id'],
+            'name': name,
+            'url': default_storage.url(name),
+            'size': size,
+        }
+
+
+def open_output(path, compress=False):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+class NdjsonWriter:
+    extension = 'ndjson'
+
+    def __init__(self, file, fields):
+        self.file = file
+
+    def write(self, row):
+        self.file.write(json.dumps(row, ensure_ascii=False))
+        self.file.write('\n')
+
+
+class CsvWriter:
+    extension = 'csv'
+
+    def __init__(self, file, fields):
+        self.writer = csv.DictWriter(file, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+WRITERS = {
+    'ndjson': NdjsonWriter,
+    'csv': CsvWriter,
+}
@@ -0,0 +1,123 @@
+"""
+Приём картинок постов.
+
+validate() в форме читает только заголовок файла и отклоняет
+слишком большие (в том числе «бомбы» распаковки) изображения.
+Остальное делает фоновая задача ingest() после сохранения поста:
+поворот по EXIF, уменьшение до IMAGE_MAX_SIZE, удаление метаданных
+и пережатие в JPEG (PNG — если есть прозрачность). Готовый файл
+заменяет исходный, после чего создаются миниатюры.
+Небольшие картинки без метаданных в обычных форматах не трогаются.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from core import workers
+
+from . import thumbnails
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+KEEP_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+METADATA_KEYS = {
+    'exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp', 'comment',
+    'photoshop',
+}
+
+
+def validate(file):
+    """Проверяет размеры по заголовку, не распаковывая картинку."""
+    position = file.tell()
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (Image.DecompressionBombError, OSError):
+        raise ValidationError('Не удалось прочитать изображение.')
+    finally:
+        file.seek(position)
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Изображение {width}×{height} слишком большое.'
+        )
+
+
+def needs_ingestion(image):
+    if getattr(image, 'is_animated', False):
+        # Анимацию не пережимаем, чтобы не потерять кадры
+        return False
+    return (
+        image.format not in KEEP_FORMATS
+        or max(image.size) > settings.IMAGE_MAX_SIZE
+        or bool(METADATA_KEYS & set(image.info))
+    )
+
+
+def _has_alpha(image):
+    return (
+        image.mode in ('RGBA', 'LA', 'PA')
+        or 'transparency' in image.info
+    )
+
+
+def reencode(image):
+    """Возвращает (расширение, байты) обработанной картинки."""
+    limit = settings.IMAGE_MAX_SIZE
+    # JPEG распаковывается сразу в уменьшенном масштабе
+    image.draft('RGB', (limit, limit))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    buffer = io.BytesIO()
+    if _has_alpha(image):
+        image.convert('RGBA').save(buffer, 'PNG', optimize=True)
+        return 'png', buffer.getvalue()
+    image.convert('RGB').save(
+        buffer, 'JPEG',
+        quality=settings.IMAGE_JPEG_QUALITY,
+        optimize=True,
+        progressive=True,
+    )
+    return 'jpg', buffer.getvalue()
+
+
+def _reencode_file(name, post_id):
+    """Заменяет файл обработанным; новое имя или None, если не нужно."""
+    storage = Post._meta.get_field('image').storage
+    with storage.open(name) as file, Image.open(file) as image:
+        if not needs_ingestion(image):
+            return name
+        extension, content = reencode(image)
+    stem, _ = os.path.splitext(name)
+    new_name = storage.save(f'{stem}.{extension}', ContentFile(content))
+    # Пост могли снова отредактировать — тогда результат не нужен
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image=new_name
+    )
+    storage.delete(name if updated else new_name)
+    return new_name if updated else None
+
+
+def ingest(name, post_id):
+    """Обрабатывает загруженную картинку поста и создаёт миниатюры."""
+    try:
+        name = _reencode_file(name, post_id)
+    except Exception:
+        # При BACKGROUND_WORKERS=0 задача выполняется в Post.save(),
+        # а пост к этому времени уже сохранён
+        logger.exception('Не удалось обработать картинку %s', name)
+        return
+    if name is not None:
+        # Через блокировку, чтобы attach() не поставил вторую задачу
+        thumbnails.submit(name, post_id)
+
+
+def schedule(name, post_id):
+    """Ставит картинку в очередь после фиксации транзакции."""
+    transaction.on_commit(lambda: workers.submit(ingest, name, post_id))
@@ -0,0 +1,347 @@
+"""
+Массовый импорт групп, постов, комментариев и подписок из NDJSON
+или CSV — в формате, который пишет export_content.
+
+Авторы и группы ищутся в словарях username → id и slug → id,
+загруженных один раз, строки вставляются bulk_create без сигналов
+транзакциями по transaction_size строк. Уникальность подписок
+(follow_unique) проверяется по множеству пар в памяти, а не запросом
+на строку. Комментарии привязываются к постам только по id
+источника: соответствие id хранится в ImportedPost (по имени
+источника source), поэтому выгрузку можно загружать частями, а
+повторно загруженные посты пропускаются. Даты из источника,
+которые auto_now_add заменяет при вставке, возвращаются одним
+UPDATE на порцию — create_dated().
+Новые посты индексируются для поиска вместе со вставкой, а ленты
+затронутых читателей и счётчики затронутых авторов пересобираются
+один раз после импорта — Importer.rebuild(); весь набор целиком
+(для сгенерированных данных) пересобирает rebuild(). Миниатюры
+картинок создаются при первом показе страниц с постами.
+"""
+import csv
+import gzip
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import cache_versions, search, stats, timeline
+from .models import Comment, Follow, Group, ImportedPost, Post, User
+
+BATCH_SIZE = 500
+DEFAULT_SOURCE = 'default'
+TRANSACTION_SIZE = 10000
+# Порядок импорта: строки ссылаются только на уже загруженные таблицы
+MODELS = {
+    'group': Group,
+    'post': Post,
+    'comment': Comment,
+    'follow': Follow,
+}
+DATE_FIELDS = {Post: 'pub_date', Comment: 'created'}
+
+
+def parse_name(path):
+    """Таблица и формат по имени файла: post.ndjson, comment.csv.gz."""
+    name = os.path.basename(path)
+    if name.endswith('.gz'):
+        name = name[:-len('.gz')]
+    table, _, extension = name.partition('.')
+    return table, extension
+
+
+def read(path):
+    """Строки файла словарями, не загружая файл в память целиком."""
+    _, extension = parse_name(path)
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as file:
+        if extension == 'csv':
+            for row in csv.DictReader(file):
+                yield {
+                    name: value if value != '' else None
+                    for name, value in row.items()
+                }
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def _date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def create_dated(model, objs, batch_size=BATCH_SIZE):
+    """
+    bulk_create без сигналов с датами создания из объектов.
+    auto_now_add ставит при вставке текущее время; флаг поля общий
+    для всех потоков, поэтому не меняется, а даты возвращаются
+    bulk_update по найденным id. Объекты без id (точные дубли,
+    см. BulkCreateQuerySet._fill_ids) остаются с датой вставки.
+    """
+    field = DATE_FIELDS[model]
+    dates = [getattr(obj, field) for obj in objs]
+    model.objects.bulk_create(
+        objs, batch_size=batch_size, send_signal=False
+    )
+    for obj, date in zip(objs, dates):
+        setattr(obj, field, date)
+    model.objects.bulk_update(
+        [obj for obj in objs if obj.pk is not None], [field],
+        batch_size=batch_size,
+    )
+
+
+def rebuild(scopes=()):
+    """
+    Ленты, поиск, счётчики и версии кэша после массовой загрузки
+    без сигналов — один раз на всю загрузку.
+    """
+    timeline.rebuild()
+    search.rebuild(Post.objects.all())
+    stats.reconcile()
+    for scope in {('index',), ('groups',), ('users',), *scopes}:
+        cache_versions.bump(*scope)
+
+
+class Importer:
+    """
+    Импортирует таблицы по очереди (load) и один раз пересобирает
+    производные данные (rebuild). Соответствие id постов источника
+    и базы подгружается из ImportedPost порциями вместе со строками.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE,
+                 transaction_size=TRANSACTION_SIZE, create_users=False,
+                 source=DEFAULT_SOURCE):
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.create_users = create_users
+        self.source = source
+        # id в источнике → id в базе
+        self.post_ids = {}
+        # Посты из прошлых запусков: их страницы надо сбросить
+        self.earlier_posts = set()
+        # Области кэша, данные которых изменил импорт
+        self.scopes = set()
+        # Авторы новых постов и подписок, подписчики новых подписок
+        self.authors = set()
+        self.followers = set()
+
+    @cached_property
+    def users(self):
+        return dict(
+            User.objects.values_list('username', 'id').iterator()
+        )
+
+    @cached_property
+    def groups(self):
+        return dict(Group.objects.values_list('slug', 'id').iterator())
+
+    @cached_property
+    def follows(self):
+        return set(
+            Follow.objects.values_list('user_id', 'author_id').iterator()
+        )
+
+    def load(self, table, rows):
+        """Импортирует строки таблицы; возвращает (вставлено, пропущено)."""
+        build = getattr(self, f'_build_{table}')
+        created = skipped = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.transaction_size))
+            if not chunk:
+                return created, skipped
+            if self.create_users:
+                self._create_users(chunk)
+            if table in ('post', 'comment'):
+                field = 'id' if table == 'post' else 'post_id'
+                self._load_post_ids(row.get(field) for row in chunk)
+            objs = []
+            for row in chunk:
+                try:
+                    obj = build(row)
+                except (KeyError, TypeError, ValueError):
+                    obj = None
+                if obj is None:
+                    skipped += 1
+                else:
+                    objs.append(obj)
+            with transaction.atomic():
+                getattr(self, f'_insert_{table}')(objs)
+            created += len(objs)
+
+    def rebuild(self):
+        """
+        Ленты подписчиков затронутых авторов и новых подписчиков,
+        счётчики затронутых авторов и версии кэша — а не всё заново.
+        """
+        readers = set(self.followers)
+        readers.update(user_id for _, user_id in self._lookup(
+            Follow.objects.exclude(user=None), 'author_id', self.authors,
+            'user_id'
+        ))
+        timeline.rebuild(readers)
+        stats.reconcile(self.authors)
+        for scope in {('index',), ('groups',), ('users',), *self.scopes}:
+            cache_versions.bump(*scope)
+
+    def _lookup(self, queryset, field, values, target='id'):
+        values = list(values)
+        for start in range(0, len(values), self.batch_size):
+            yield from queryset.filter(**{
+                f'{field}__in': values[start:start + self.batch_size]
+            }).values_list(field, target)
+
+    def _load_post_ids(self, values):
+        """Подгружает соответствие id постов, загруженных раньше."""
+        source_ids = set()
+        for value in values:
+            try:
+                source_ids.add(_int(value))
+            except (TypeError, ValueError):
+                continue
+        source_ids -= {None, *self.post_ids}
+        found = dict(self._lookup(
+            ImportedPost.objects.filter(source=self.source), 'source_id',
+            source_ids, 'post_id'
+        ))
+        self.post_ids.update(found)
+        self.earlier_posts.update(found.values())
+
+    def _create_users(self, chunk):
+        names = {
+            row.get(field) for row in chunk for field in ('author', 'user')
+        }
+        names = {
+            name for name in names
+            if isinstance(name, str) and name and name not in self.users
+        }
+        if not names:
+            return
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in names],
+            batch_size=self.batch_size,
+        )
+        self.users.update(self._lookup(User.objects, 'username', names))
+
+    # Строки → объекты; None — строка пропускается
+
+    def _build_group(self, row):
+        slug = row['slug']
+        if not slug or slug in self.groups:
+            return None
+        self.groups[slug] = None
+        return Group(
+            title=row['title'], slug=slug,
+            description=row.get('description') or '',
+        )
+
+    def _build_post(self, row):
+        author_id = self.users.get(row.get('author'))
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                return None
+        if author_id is None or not row.get('text'):
+            return None
+        source_id = _int(row.get('id'))
+        if source_id in self.post_ids:
+            # Пост уже загружен раньше или встретился дважды
+            return None
+        post = Post(
+            text=row['text'], author_id=author_id, group_id=group_id,
+            image=row.get('image') or '', pub_date=_date(row.get('pub_date')),
+        )
+        post.source_id = source_id
+        if source_id is not None:
+            self.post_ids[source_id] = None
+        self.scopes.add(('author', author_id))
+        self.authors.add(author_id)
+        if group_id is not None:
+            self.scopes.add(('group', group_id))
+        return post
+
+    def _build_comment(self, row):
+        author_id = self.users.get(row.get('author'))
+        post_id = self._post_id(_int(row.get('post_id')))
+        if author_id is None or post_id is None or not row.get('text'):
+            return None
+        return Comment(
+            post_id=post_id, author_id=author_id, text=row['text'],
+            created=_date(row.get('created')),
+        )
+
+    def _post_id(self, source_id):
+        # Только через соответствие id: пост источника, который
+        # пропущен или не загружался, не совпадает с постом базы
+        post_id = self.post_ids.get(source_id)
+        if post_id in self.earlier_posts:
+            self.scopes.add(('post', post_id))
+        return post_id
+
+    def _build_follow(self, row):
+        user_id = self.users.get(row.get('user'))
+        author_id = self.users.get(row.get('author'))
+        pair = (user_id, author_id)
+        if None in pair or user_id == author_id or pair in self.follows:
+            return None
+        self.follows.add(pair)
+        self.scopes.add(('follower', user_id))
+        self.followers.add(user_id)
+        self.authors.add(author_id)
+        return Follow(user_id=user_id, author_id=author_id)
+
+    # Вставка одной транзакции
+
+    def _insert_group(self, groups):
+        Group.objects.bulk_create(groups, batch_size=self.batch_size)
+        self.groups.update(self._lookup(
+            Group.objects, 'slug', [group.slug for group in groups]
+        ))
+
+    def _insert_post(self, posts):
+        create_dated(Post, posts, self.batch_size)
+        imported = []
+        for post in posts:
+            # Пост без id (точный дубль) не попадает в соответствие:
+            # его комментарии пропускаются
+            if post.source_id is not None and post.pk is not None:
+                self.post_ids[post.source_id] = post.pk
+                imported.append(ImportedPost(
+                    source=self.source, source_id=post.source_id,
+                    post_id=post.pk,
+                ))
+        ImportedPost.objects.bulk_create(imported, batch_size=self.batch_size)
+        # Дубли без id попадут в поиск после rebuild_search_index
+        search.index([post for post in posts if post.pk is not None])
+
+    def _insert_comment(self, comments):
+        create_dated(Comment, comments, self.batch_size)
+
+    def _insert_follow(self, follows):
+        # Пары уже проверены; ignore_conflicts страхует от подписок,
+        # созданных на сайте во время импорта
+        Follow.objects.bulk_create(
+            follows, batch_size=self.batch_size, ignore_conflicts=True,
+            send_signal=False,
+        )
@@ -0,0 +1,135 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from core.benchmarks import NO_CACHE
+from posts import benchmarks, views
+from posts.models import Comment, Follow, Post
+
+
+def feed_indexes():
+    return [
+        index.name
+        for model in (Post, Comment, Follow)
+        for index in model._meta.indexes
+    ]
+
+
+def explain(sql, tag=''):
+    # sqlite3 кэширует подготовленные запросы по тексту, а план EXPLAIN
+    # не перестраивается после DROP INDEX — tag делает текст уникальным
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql} /* {tag} */')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы запросов и задержку views из posts.views '
+        'с составными индексами лент и без них. Индексы удаляются '
+        'внутри транзакции, которая затем откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на SQLite')
+        targets = self.targets()
+        with override_settings(CACHES=NO_CACHE), transaction.atomic():
+            with_indexes = self.measure(targets, options['repeat'], 'with')
+            with connection.cursor() as cursor:
+                for name in feed_indexes():
+                    cursor.execute(f'DROP INDEX {name}')
+            without_indexes = self.measure(
+                targets, options['repeat'], 'without'
+            )
+            transaction.set_rollback(True)
+
+        for name in targets:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, results in (('без индексов', without_indexes),
+                                   ('с индексами', with_indexes)):
+                latency, plans = results[name]
+                self.stdout.write(f'  {label}: {latency:.2f} мс')
+                for line in plans:
+                    self.stdout.write(f'    {line}')
+
+    def targets(self):
+        found = benchmarks.targets()
+        if found is None:
+            raise CommandError(
+                'Нет данных для замера: нужны посты с группой и подписки'
+            )
+        author, group, post, follower, word = (
+            found['author'], found['group'], found['post'],
+            found['reader'], found['query'],
+        )
+        # Вторая порция комментариев — выборка по курсору через
+        # comment_post_created_idx (post, -created, -id)
+        comments = reverse('posts:post_comments', args=(post.id,))
+        cursor = views.comment_page(post.id).paginator.next_cursor
+        if cursor:
+            comments += '?' + urlencode({'cursor': cursor})
+        return {
+            'index': (views.index, reverse('posts:index'), {}, author),
+            'group_posts': (
+                views.group_posts,
+                reverse('posts:group_list', args=(group.slug,)),
+                {'slug': group.slug}, author,
+            ),
+            'profile': (
+                views.profile,
+                reverse('posts:profile', args=(author.username,)),
+                {'username': author.username}, author,
+            ),
+            'post_detail': (
+                views.post_detail,
+                reverse('posts:post_detail', args=(post.id,)),
+                {'post_id': post.id}, author,
+            ),
+            'post_comments': (
+                views.post_comments, comments, {'post_id': post.id}, author,
+            ),
+            'follow_index': (
+                views.follow_index, reverse('posts:follow_index'), {},
+                follower,
+            ),
+            'search': (
+                views.search,
+                reverse('posts:search') + '?' + urlencode({'q': word}),
+                {}, author,
+            ),
+        }
+
+    @staticmethod
+    def request(path, user):
+        request = RequestFactory().get(path, HTTP_HOST='127.0.0.1')
+        # Залогиненный пользователь обходит кэш страниц для анонимов
+        request.user = user
+        return request
+
+    def measure(self, targets, repeat, tag):
+        results = {}
+        for name, (view, path, kwargs, user) in targets.items():
+            with CaptureQueriesContext(connection) as queries:
+                view(self.request(path, user), **kwargs)
+            plans = []
+            for query in queries:
+                for line in explain(query['sql'], tag):
+                    if line not in plans:
+                        plans.append(line)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                view(self.request(path, user), **kwargs)
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings), plans
+        return results
@@ -0,0 +1,142 @@
+import json
+import os
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from posts import benchmarks
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку, SQL-запросы и рендер шаблонов views posts, '
+        'users и about на синтетических наборах small/medium/large, '
+        'пишет JSON и сравнивает его с базовым замером.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', nargs='+', choices=list(benchmarks.SCALES),
+            default=['small', 'medium'],
+        )
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cases', nargs='+', default=None,
+            help='Только эти сценарии, например posts:index'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--data-dir', default='.benchmarks',
+            help='Каталог баз с наборами данных (создаются один раз)'
+        )
+        parser.add_argument(
+            '--output', default=None, help='Записать результаты в JSON'
+        )
+        parser.add_argument(
+            '--baseline', default=None,
+            help='JSON базового замера: регрессии завершают команду ошибкой'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост задержки (доля)'
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0,
+            help='Рост задержки меньше этого не считается регрессией'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на SQLite')
+        unknown = set(options['cases'] or ()) - {
+            case.name for case in benchmarks.CASES
+        }
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        baseline = None
+        if options['baseline']:
+            # Читается до замеров: ошибка в пути не должна стоить прогона
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        results = {
+            'created': timezone.now().isoformat(),
+            'environment': benchmarks.environment(),
+            'scales': {},
+        }
+        os.makedirs(options['data_dir'], exist_ok=True)
+        for scale in options['scales']:
+            with self.dataset(scale, options):
+                try:
+                    cases = benchmarks.run(
+                        options['repeat'], options['warmup'],
+                        options['cases'],
+                    )
+                except RuntimeError as error:
+                    raise CommandError(error)
+            results['scales'][scale] = {
+                'dataset': benchmarks.SCALES[scale], 'cases': cases,
+            }
+            self.report(scale, cases)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if baseline is not None:
+            self.check_regressions(results, baseline, options)
+
+    def check_regressions(self, results, baseline, options):
+        regressions = benchmarks.compare(
+            results, baseline, options['tolerance'], options['min_delta_ms']
+        )
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f'Регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    @contextmanager
+    def dataset(self, scale, options):
+        """Переключает соединение на базу набора, создавая её один раз."""
+        connection.settings_dict['TEST']['NAME'] = os.path.abspath(
+            os.path.join(
+                options['data_dir'], f'{scale}-{options["seed"]}.sqlite3'
+            )
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=True
+        )
+        keepdb = True
+        try:
+            if not Post.objects.exists():
+                self.stdout.write(f'Создаётся набор {scale}…')
+                try:
+                    benchmarks.populate(scale, options['seed'])
+                except BaseException:
+                    # Недостроенный набор не должен попасть в замеры
+                    keepdb = False
+                    raise
+            yield
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=keepdb
+            )
+
+    def report(self, scale, cases):
+        self.stdout.write(self.style.MIGRATE_HEADING(scale))
+        self.stdout.write(
+            f'  {"сценарий":<32} {"p50":>8} {"p95":>8} {"SQL":>4} '
+            f'{"SQL мс":>8} {"рендер":>8}'
+        )
+        for name, metrics in cases.items():
+            self.stdout.write(
+                f'  {name:<32} {metrics["p50_ms"]:8.2f} '
+                f'{metrics["p95_ms"]:8.2f} {metrics["queries"]:4d} '
+                f'{metrics["sql_ms"]:8.2f} {metrics["render_ms"]:8.2f}'
+            )
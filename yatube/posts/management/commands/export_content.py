@@ -0,0 +1,114 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает группы, посты, комментарии и подписки '
+        'в NDJSON или CSV, по файлу на таблицу. С --state выгружает '
+        'только строки, появившиеся после предыдущего запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help=f'Таблицы: {", ".join(export.TABLES)} (по умолчанию все)'
+        )
+        parser.add_argument('--output', default='.', help='Каталог файлов')
+        parser.add_argument(
+            '--format', choices=list(export.WRITERS), default='ndjson'
+        )
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--since', default=None,
+            help='Только посты и комментарии не старше даты (ISO 8601)'
+        )
+        parser.add_argument(
+            '--state', default=None,
+            help='JSON-файл с последними выгруженными id по таблицам'
+        )
+        parser.add_argument(
+            '--images', action='store_true',
+            help='Записать манифест картинок выгруженных постов'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or list(export.TABLES)
+        unknown = set(tables) - set(export.TABLES)
+        if unknown:
+            raise CommandError(f'Неизвестные таблицы: {", ".join(unknown)}')
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('--since: ожидается дата в ISO 8601')
+        state = self.load_state(options['state'])
+        os.makedirs(options['output'], exist_ok=True)
+
+        for table in tables:
+            rows = export.rows(
+                table, since, state.get(table, 0), options['chunk_size']
+            )
+            images = None
+            if table == 'post' and options['images']:
+                images = self.open_writer(
+                    'images', export.IMAGE_FIELDS, options
+                )
+                rows = self.tee_images(rows, images[1])
+            file, writer = self.open_writer(
+                table, list(export.TABLES[table][1]), options
+            )
+            count = 0
+            with file:
+                for row in rows:
+                    writer.write(row)
+                    state[table] = row['id']
+                    count += 1
+            if images is not None:
+                images[0].close()
+            self.stdout.write(f'{table}: {count}')
+
+        if options['state']:
+            self.save_state(options['state'], state)
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена'))
+
+    @staticmethod
+    def open_writer(name, fields, options):
+        writer_class = export.WRITERS[options['format']]
+        filename = f'{name}.{writer_class.extension}'
+        if options['gzip']:
+            filename += '.gz'
+        file = export.open_output(
+            os.path.join(options['output'], filename), options['gzip']
+        )
+        return file, writer_class(file, fields)
+
+    @staticmethod
+    def tee_images(rows, writer):
+        for row in rows:
+            for image in export.image_rows([row]):
+                writer.write(image)
+            yield row
+
+    @staticmethod
+    def load_state(path):
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    @staticmethod
+    def save_state(path, state):
+        # Метка обновляется только после успешной выгрузки всех таблиц
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temporary, path)
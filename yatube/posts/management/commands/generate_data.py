@@ -0,0 +1,103 @@
+import os
+import time
+from datetime import datetime, time as day_start
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import importer, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных заданного размера: '
+        'пользователей, группы, посты, комментарии и подписки. '
+        'Одинаковые seed, размеры и --until дают одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows-per-user', type=int, default=20,
+            help='Среднее число подписок пользователя'
+        )
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Сколько постов получат картинки'
+        )
+        parser.add_argument(
+            '--years', type=int, default=3,
+            help='За сколько лет распределены даты постов'
+        )
+        parser.add_argument(
+            '--until', default=None,
+            help='Дата последнего поста (ISO 8601), по умолчанию '
+                 'начало текущих суток'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Процессов для рисования картинок; 0 — без пула'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=importer.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--transaction-size', type=int,
+            default=importer.TRANSACTION_SIZE
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересобирать ленты, поиск, счётчики и кэш'
+        )
+
+    def handle(self, *args, **options):
+        generator = synthetic.Generator(
+            seed=options['seed'],
+            until=self.until(options['until']),
+            years=options['years'],
+            batch_size=options['batch_size'],
+            transaction_size=options['transaction_size'],
+            workers=options['workers'],
+        )
+        steps = (
+            ('users', generator.users, (options['users'],)),
+            ('groups', generator.groups, (options['groups'],)),
+            ('posts', generator.posts, (
+                options['posts'], options['images']
+            )),
+            ('comments', generator.comments, (options['comments'],)),
+            ('follows', generator.follows, (options['follows_per_user'],)),
+        )
+        for name, step, step_args in steps:
+            started = time.perf_counter()
+            count = step(*step_args)
+            elapsed = time.perf_counter() - started
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{name}: {count} ({elapsed:.1f} с, {rate:.0f} строк/с)'
+            )
+        if not options['skip_rebuild']:
+            started = time.perf_counter()
+            importer.rebuild()
+            self.stdout.write(
+                f'Пересборка: {time.perf_counter() - started:.1f} с'
+            )
+        self.stdout.write(self.style.SUCCESS('Данные созданы'))
+
+    @staticmethod
+    def until(value):
+        if value is None:
+            return timezone.make_aware(
+                datetime.combine(timezone.now().date(), day_start())
+            )
+        until = parse_datetime(value)
+        if until is None:
+            raise CommandError('--until: ожидается дата в ISO 8601')
+        if timezone.is_naive(until):
+            until = timezone.make_aware(until)
+        return until
@@ -0,0 +1,104 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово импортирует группы, посты, комментарии и подписки из '
+        'файлов export_content (NDJSON или CSV, можно .gz) и один раз '
+        'пересобирает ленты, поиск, счётчики и версии кэша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help='Файлы <таблица>.<формат>[.gz] или каталоги с ними'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=importer.BATCH_SIZE,
+            help='Строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--transaction-size', type=int,
+            default=importer.TRANSACTION_SIZE,
+            help='Строк в одной транзакции'
+        )
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создать недостающих пользователей (без пароля)'
+        )
+        parser.add_argument(
+            '--source', default=importer.DEFAULT_SOURCE,
+            help='Имя источника: по нему комментарии находят посты, '
+                 'загруженные прошлыми частями той же выгрузки'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересобирать производные данные (при импорте частями '
+                 'пересоберите их после последней части)'
+        )
+
+    def handle(self, *args, **options):
+        files = self.collect(options['paths'])
+        loader = importer.Importer(
+            batch_size=options['batch_size'],
+            transaction_size=options['transaction_size'],
+            create_users=options['create_users'],
+            source=options['source'],
+        )
+        started = time.perf_counter()
+        total = 0
+        for table, path in files:
+            table_started = time.perf_counter()
+            created, skipped = loader.load(table, importer.read(path))
+            total += created
+            self.report(
+                f'{os.path.basename(path)}: вставлено {created}, '
+                f'пропущено {skipped}', created, table_started
+            )
+        if not options['skip_rebuild']:
+            rebuild_started = time.perf_counter()
+            loader.rebuild()
+            self.stdout.write(
+                f'Пересборка: {time.perf_counter() - rebuild_started:.1f} с'
+            )
+        self.report('Импорт завершён', total, started, self.style.SUCCESS)
+
+    def report(self, message, rows, started, style=str):
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(style(
+            f'{message} ({elapsed:.1f} с, {rate:.0f} строк/с)'
+        ))
+
+    @staticmethod
+    def collect(paths):
+        """Файлы в порядке таблиц: группы, посты, комментарии, подписки."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                # Остальные файлы выгрузки (манифест картинок) пропускаем
+                files += [
+                    os.path.join(path, name) for name in sorted(
+                        os.listdir(path)
+                    ) if importer.parse_name(name)[0] in importer.MODELS
+                ]
+            elif not os.path.exists(path):
+                raise CommandError(f'{path}: файл не найден')
+            elif importer.parse_name(path)[0] in importer.MODELS:
+                files.append(path)
+            else:
+                raise CommandError(
+                    f'{path}: ожидается файл '
+                    f'{"|".join(importer.MODELS)}.<формат>[.gz]'
+                )
+        tables = list(importer.MODELS)
+        return sorted(
+            (
+                (importer.parse_name(path)[0], path) for path in files
+            ), key=lambda item: tables.index(item[0])
+        )
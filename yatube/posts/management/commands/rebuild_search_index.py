@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает полнотекстовый индекс постов (FTS5), например '
+        'после массовой загрузки через bulk_create или update().'
+    )
+
+    def handle(self, *args, **options):
+        count = search.rebuild(Post.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {count}'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id', type=int, default=None,
+            help='Пересобрать ленту только одного пользователя'
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user_id']
+        follows = timeline.rebuild(None if user_id is None else [user_id])
+        self.stdout.write(self.style.SUCCESS(
+            f'Ленты пересобраны, подписок обработано: {follows}'
+        ))
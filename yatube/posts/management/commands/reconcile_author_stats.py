@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики постов и подписчиков авторов с данными '
+        'и исправляет расхождения. Рассчитана на периодический запуск.'
+    )
+
+    def handle(self, *args, **options):
+        repaired = stats.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено записей статистики: {repaired}'
+        ))
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Имя таблицы зафиксировано здесь, а не берётся из posts.search:
+# миграция не должна меняться вместе с кодом приложения
+TABLE = 'posts_post_fts'
+
+
+def create_index(apps, schema_editor):
+    # Только пустая таблица: существующие посты индексирует команда
+    # rebuild_search_index порциями, со стеммером текущей версии
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5('
+        f'body, tokenize = "unicode61 remove_diacritics 2")'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_authorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,9 +1,101 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
+from django.dispatch import Signal
 
 User = get_user_model()
 
+# Отправляются после bulk_create, который не шлёт post_save
+posts_bulk_created = Signal(providing_args=['posts'])
+comments_bulk_created = Signal(providing_args=['comments'])
+follows_bulk_created = Signal(providing_args=['follows'])
+
+
+class BulkCreateQuerySet(models.QuerySet):
+    """
+    bulk_create в одной транзакции с проставлением id и сигналом
+    bulk_signal (аргумент signal_arg — созданные объекты).
+    send_signal=False — для массового импорта, после которого
+    производные данные пересобираются целиком.
+    """
+    bulk_signal = None
+    signal_arg = None
+    # Поля, по которым новая строка находится после вставки;
+    # первое — для выборки порциями, по остальным сверка в памяти
+    natural_key = ()
+    lookup_size = 500
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False,
+                    send_signal=True):
+        if not objs:
+            return objs
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(
+                objs, batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts,
+            )
+            if not ignore_conflicts:
+                self._fill_ids(objs)
+            if send_signal:
+                self.bulk_signal.send(
+                    sender=self.model, **{self.signal_arg: objs}
+                )
+        return objs
+
+    def _key(self, obj):
+        return tuple(getattr(obj, name) for name in self.natural_key)
+
+    def _fill_ids(self, objs):
+        """
+        SQLite не возвращает id из INSERT, поэтому строки перечитываются
+        по natural_key в той же транзакции. id получает только объект,
+        ключ которого один в пакете и в таблице; остальные остаются
+        с pk=None — угадывать id по порядку строк нельзя.
+        """
+        missing = {}
+        for obj in objs:
+            if obj.pk is None:
+                missing.setdefault(self._key(obj), []).append(obj)
+        if not missing:
+            return
+        field = self.natural_key[0]
+        values = list({key[0] for key in missing})
+        found = {}
+        for start in range(0, len(values), self.lookup_size):
+            rows = self.model._base_manager.using(self.db).filter(**{
+                f'{field}__in': values[start:start + self.lookup_size]
+            }).values_list('pk', *self.natural_key)
+            for pk, *key in rows:
+                key = tuple(key)
+                if key in missing:
+                    found.setdefault(key, []).append(pk)
+        for key, pks in found.items():
+            if len(pks) != 1 or len(missing[key]) != 1:
+                continue
+            obj = missing[key][0]
+            obj.pk = pks[0]
+            obj._state.adding = False
+            obj._state.db = self.db
+
+
+class PostQuerySet(BulkCreateQuerySet):
+    bulk_signal = posts_bulk_created
+    signal_arg = 'posts'
+    natural_key = ('pub_date', 'author_id', 'group_id', 'text')
+
+
+class CommentQuerySet(BulkCreateQuerySet):
+    bulk_signal = comments_bulk_created
+    signal_arg = 'comments'
+    natural_key = ('created', 'post_id', 'author_id', 'text')
+
+
+class FollowQuerySet(BulkCreateQuerySet):
+    bulk_signal = follows_bulk_created
+    signal_arg = 'follows'
+    # follow_unique: пара встречается в таблице один раз
+    natural_key = ('user_id', 'author_id')
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
@@ -44,10 +136,24 @@ class Post(models.Model):
         blank=True
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Ленты упорядочены по (-pub_date, -id) — как и курсор
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_date_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -73,10 +179,18 @@ class Comment(models.Model):
     text = models.TextField(help_text='Оставьте комментарий')
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -97,9 +211,117 @@ class Follow(models.Model):
         verbose_name='Подписка'
     )
 
+    objects = FollowQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
         constraints = [
             UniqueConstraint(fields=['user', 'author'], name='follow_unique')
         ]
+        # Обратный индекс: подписчики автора (рассылка, счётчики)
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """
+    Материализованная лента подписок: строка на пару (подписчик, пост).
+    Записи с user=None — «широковещательные» посты популярных авторов,
+    которые подписчики подтягивают к себе при чтении ленты.
+    """
+    user = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+    pulled = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-pub_date', '-post']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='timeline_unique')
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='timeline_author_date_idx'
+            ),
+        ]
+
+
+class AuthorStats(models.Model):
+    """
+    Денормализованные счётчики автора.
+    Поддерживаются сигналами, расхождения чинит
+    команда reconcile_author_stats.
+    """
+    author = models.OneToOneField(
+        User,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.IntegerField('Постов', default=0)
+    follower_count = models.IntegerField('Подписчиков', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self) -> str:
+        return f'{self.author_id}: {self.post_count}/{self.follower_count}'
+
+
+class ImportedPost(models.Model):
+    """
+    Соответствие id поста в источнике импорта и поста в базе.
+    Комментарии, импортированные позже (следующей частью выгрузки),
+    привязываются к постам только через эту таблицу.
+    """
+    source = models.CharField('Источник', max_length=100)
+    source_id = models.BigIntegerField('Id в источнике')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+
+    class Meta:
+        verbose_name = 'Импортированный пост'
+        verbose_name_plural = 'Импортированные посты'
+        constraints = [
+            UniqueConstraint(
+                fields=['source', 'source_id'], name='imported_post_unique'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.source}:{self.source_id} → {self.post_id}'
@@ -0,0 +1,50 @@
+"""
+Состояние страниц для core.page_cache: версии областей кэша,
+от которых зависит страница, и время их последней смены
+(cache_versions.get_state). Любая правка, удаление или
+переименование меняет версию, а значит, и Last-Modified.
+Каждая функция — не больше одного запроса по индексу, без рендера.
+"""
+from . import cache_versions
+from .models import Group, Post, User
+
+
+def index_state(request):
+    return cache_versions.get_state([('index',)])
+
+
+def group_state(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return cache_versions.get_state([('group', group_id), ('users',)])
+
+
+def profile_state(request, username):
+    author = User.objects.filter(username=username).values_list(
+        'id', 'stats__post_count', 'stats__follower_count'
+    ).first()
+    if author is None:
+        return None
+    author_id, *counters = author
+    basis, modified = cache_versions.get_state([
+        ('author', author_id), ('groups',), ('stats', author_id), ('stats',),
+    ])
+    # Число подписчиков меняется без смены постов — учитываем его отдельно
+    return '.'.join([basis, *map(str, counters)]), modified
+
+
+def post_detail_state(request, post_id):
+    post = Post.objects.filter(id=post_id).values_list(
+        'author_id', 'author__stats__post_count'
+    ).first()
+    if post is None:
+        return None
+    author_id, post_count = post
+    basis, modified = cache_versions.get_state([
+        ('post', post_id), ('users',), ('groups',),
+        ('stats', author_id), ('stats',),
+    ])
+    return f'{basis}.{post_count}', modified
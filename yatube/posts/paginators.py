@@ -0,0 +1,198 @@
+from django.core import signing
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+CURSOR_SALT = 'posts.paginators.cursor'
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset-паджинатор по паре (pub_date, id).
+    Вместо LIMIT/OFFSET и COUNT(*) страница выбирается условием
+    «строго после/до курсора», поэтому стоимость запроса зависит
+    только от размера страницы, а не от её глубины.
+    Курсоры подписаны и для клиента непрозрачны.
+    """
+    is_cursor = True
+    date_field = 'pub_date'
+    id_field = 'id'
+
+    def __init__(self, object_list, per_page, date_field=None,
+                 id_field=None):
+        self.date_field = date_field or self.date_field
+        self.id_field = id_field or self.id_field
+        object_list = object_list.order_by(
+            f'-{self.date_field}', f'-{self.id_field}'
+        )
+        super().__init__(object_list, per_page)
+        self.next_cursor = None
+        self.previous_cursor = None
+        self._num_pages = 1
+        self._count = 0
+
+    @property
+    def count(self):
+        # COUNT(*) не выполняется: известна только нижняя граница —
+        # объекты до конца текущей страницы и ещё один, если есть
+        # следующая. На последней странице это точное число, поэтому
+        # start_index() и end_index() страницы считаются верно.
+        return self._count
+
+    @property
+    def num_pages(self):
+        # Известна только соседняя страница, поэтому номер последней
+        # страницы — это текущая страница плюс следующая, если она есть.
+        return self._num_pages
+
+    def get_page_number(self, number):
+        """
+        Страница по номеру для старых ссылок ?page=N: OFFSET без COUNT(*).
+        Дальше страницы листаются курсорами.
+        """
+        page = self._slice(
+            self.object_list, self.per_page * (number - 1), number,
+            has_previous=number > 1,
+        )
+        if number > 1 and not page.object_list:
+            return self._page_after(None, 1)
+        return page
+
+    def get_page(self, cursor=None):
+        try:
+            position = self.decode_cursor(cursor) if cursor else None
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            position = None
+        if position is None:
+            return self._page_after(None, 1)
+        date, pk, number, backwards = position
+        if backwards:
+            return self._page_before((date, pk), number)
+        return self._page_after((date, pk), number)
+
+    def _after(self, key, inclusive=False):
+        date, pk = key
+        id_lookup = 'lte' if inclusive else 'lt'
+        return Q(**{f'{self.date_field}__lt': date}) | Q(**{
+            self.date_field: date, f'{self.id_field}__{id_lookup}': pk,
+        })
+
+    def _before(self, key):
+        date, pk = key
+        return Q(**{f'{self.date_field}__gt': date}) | Q(**{
+            self.date_field: date, f'{self.id_field}__gt': pk,
+        })
+
+    def _key(self, obj):
+        # Поддерживаются и объекты моделей, и строки QuerySet.values()
+        if isinstance(obj, dict):
+            return obj[self.date_field], obj[self.id_field]
+        return getattr(obj, self.date_field), getattr(obj, self.id_field)
+
+    def _page_after(self, key, number):
+        queryset = self.object_list
+        if key is not None:
+            queryset = queryset.filter(self._after(key))
+        return self._slice(
+            queryset, 0, number, has_previous=key is not None and number > 1
+        )
+
+    def _slice(self, queryset, offset, number, has_previous):
+        object_list = queryset[offset:offset + self.per_page]
+        # QuerySet вычисляется здесь (с prefetch_related) и кэширует
+        # строки сам; наличие следующей страницы проверяет EXISTS по
+        # индексу. Он выполняется и для неполной страницы, чтобы число
+        # запросов не зависело от количества строк (см. query_budget)
+        has_next = bool(object_list) and queryset.filter(
+            self._after(self._key(object_list[len(object_list) - 1]))
+        ).exists()
+        return self._build_page(object_list, number, has_previous, has_next)
+
+    def _page_before(self, key, number):
+        # Идём назад: берём per_page + 1 ключей над курсором
+        # в возрастающем порядке, чтобы понять, есть ли страница выше.
+        keys = list(
+            self.object_list.filter(self._before(key)).order_by(
+                self.date_field, self.id_field
+            ).values_list(self.date_field, self.id_field)[:self.per_page + 1]
+        )
+        if not keys:
+            return self._page_after(None, 1)
+        has_previous = len(keys) > self.per_page
+        # Если над страницей появились новые записи, она уже не первая.
+        number = max(number, 2) if has_previous else 1
+        top = keys[:self.per_page][-1]
+        object_list = self.object_list.filter(
+            self._after(top, inclusive=True)
+        ).filter(self._before(key))[:self.per_page]
+        return self._build_page(object_list, number, has_previous, True)
+
+    def _build_page(self, object_list, number, has_previous, has_next):
+        items = list(object_list)
+        if items and has_next:
+            self.next_cursor = self.encode_cursor(
+                self._key(items[-1]), number + 1
+            )
+        if items and has_previous:
+            self.previous_cursor = self.encode_cursor(
+                self._key(items[0]), number - 1, backwards=True
+            )
+        self._num_pages = number + 1 if has_next else number
+        self._count = (
+            self.per_page * (number - 1) + len(items) + int(has_next)
+        )
+        return Page(object_list, number, self)
+
+    @staticmethod
+    def encode_cursor(key, number, backwards=False):
+        date, pk = key
+        return signing.dumps(
+            [date.isoformat(), pk, number, int(backwards)],
+            salt=CURSOR_SALT
+        )
+
+    @staticmethod
+    def decode_cursor(cursor):
+        date, pk, number, backwards = signing.loads(cursor, salt=CURSOR_SALT)
+        date = parse_datetime(date)
+        if date is None or int(number) < 1:
+            raise ValueError('Некорректный курсор')
+        return date, int(pk), int(number), bool(backwards)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Паджинатор админки для больших таблиц: вместо COUNT(*) по всей
+    таблице без фильтров число строк оценивается по MAX(pk) (один шаг
+    по индексу), а с фильтрами считается не дальше count_limit строк.
+    После удалений оценка завышена: пустая страница за концом данных
+    заменяется последней настоящей (validate_number), а упор в
+    count_limit показывается как «10000+» (count_display).
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return queryset.aggregate(estimate=Max('pk'))['estimate'] or 0
+        return queryset.order_by()[:self.count_limit].count()
+
+    @property
+    def count_display(self):
+        """Число строк для шаблона; при упоре в count_limit — «N+»."""
+        if self.object_list.query.where and self.count >= self.count_limit:
+            return f'{self.count_limit}+'
+        return self.count
+
+    def validate_number(self, number):
+        number = super().validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if number > 1 and not self.object_list[bottom:bottom + 1].exists():
+            # Оценка завышена: строки до пустой страницы считаются
+            # точно, это не дороже OFFSET самой страницы
+            self.count = self.object_list.order_by()[:bottom].count()
+            self.__dict__.pop('num_pages', None)
+            number = self.num_pages
+        return number
@@ -0,0 +1,202 @@
+"""
+Полнотекстовый поиск по постам на SQLite FTS5.
+
+В виртуальной таблице posts_post_fts (rowid = id поста) хранится
+текст поста, приведённый к основам слов стеммером Snowball для
+русского языка. FTS5 своего русского стеммера не имеет, поэтому
+основы считаются в Python, а индекс обновляется сигналами, а не
+триггерами. Запрос проходит через тот же стеммер, результаты
+сортируются по bm25. На других СУБД поиск сводится к icontains.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection, transaction
+
+TABLE = 'posts_post_fts'
+REBUILD_BATCH = 1000
+STEM_CACHE_SIZE = 100000
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'\w+')
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = ((), (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = ((), (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+))
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _regions(word):
+    """Начала областей RV и R2 алгоритма Snowball."""
+    rv = r1 = r2 = len(word)
+    for i, letter in enumerate(word):
+        if letter in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _remove(word, start, endings):
+    """
+    Отрезает самое длинное окончание из endings, лежащее после start.
+    Окончания первой группы должны идти после «а» или «я».
+    Возвращает None, если отрезать нечего.
+    """
+    after_a, plain = endings
+    for ending in sorted(after_a + plain, key=len, reverse=True):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        stem = word[:-len(ending)]
+        if ending in plain:
+            return stem
+        if stem[-1:] in ('а', 'я') and len(stem) - 1 >= start:
+            return stem
+        return None
+    return None
+
+
+# Словарь текстов повторяется, а стемминг — самое дорогое в индексации
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    result = _remove(word, rv, PERFECTIVE_GERUND)
+    if result is None:
+        word = _remove(word, rv, REFLEXIVE) or word
+        result = _remove(word, rv, ADJECTIVE)
+        if result is not None:
+            result = _remove(result, rv, PARTICIPLE) or result
+        else:
+            result = _remove(word, rv, VERB) or _remove(word, rv, NOUN)
+    word = result or word
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _remove(word, r2, DERIVATIONAL) or word
+
+    if word.endswith('нн') and len(word) - 1 >= rv:
+        return word[:-1]
+    superlative = _remove(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def terms(text):
+    return [stem(word) for word in WORD_RE.findall(text.lower())]
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def index(posts):
+    """Добавляет или обновляет посты в индексе."""
+    if not is_enabled():
+        return
+    rows = [(post.pk, ' '.join(terms(post.text))) for post in posts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _ in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, body) VALUES (%s, %s)', rows
+        )
+
+
+def unindex(post_ids):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(pk,) for pk in post_ids]
+        )
+
+
+def rebuild(posts):
+    """
+    Пересобирает индекс заново; возвращает число постов.
+    Одна транзакция: поиск не видит пустой индекс, а вставки
+    не фиксируются по отдельности.
+    """
+    if not is_enabled():
+        return 0
+    count, batch = 0, []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        for post in posts.only('id', 'text').iterator(
+            chunk_size=REBUILD_BATCH
+        ):
+            batch.append(post)
+            if len(batch) == REBUILD_BATCH:
+                index(batch)
+                count, batch = count + len(batch), []
+        index(batch)
+    return count + len(batch)
+
+
+def match_expression(query):
+    """Запрос FTS5: все основы слов как префиксы, в кавычках."""
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in terms(query)
+    )
+
+
+def search(queryset, query):
+    """Посты queryset, подходящие под запрос, от более релевантных."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not is_enabled():
+        return queryset.filter(text__icontains=query)
+    return queryset.extra(
+        tables=[TABLE],
+        where=[f'{TABLE}.rowid = posts_post.id', f'{TABLE} MATCH %s'],
+        params=[expression],
+        select={'rank': f'bm25({TABLE})'},
+        order_by=['rank', '-pub_date'],
+    )
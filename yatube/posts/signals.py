@@ -0,0 +1,126 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache_versions, images, search, stats, thumbnails, timeline
+from .models import (Comment, Follow, Group, Post, User,
+                     comments_bulk_created, follows_bulk_created,
+                     posts_bulk_created)
+
+
+@receiver(pre_save, sender=Post)
+def post_remember_group(sender, instance, **kwargs):
+    # При правке пост может уйти из группы — её ленту тоже надо сбросить,
+    # а новую картинку — обработать
+    if instance.pk is not None:
+        instance._previous_group_id, instance._previous_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group_id', 'image'
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    cache_versions.bump_post(
+        instance, getattr(instance, '_previous_group_id', None)
+    )
+    search.index([instance])
+    if created:
+        timeline.fan_out(instance)
+        stats.change(instance.author_id, post_count=1)
+    if not instance.image:
+        return
+    if instance.image.name != getattr(instance, '_previous_image', None):
+        images.schedule(instance.image.name, instance.pk)
+    else:
+        thumbnails.schedule(instance.image.name, instance.pk)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def posts_bulk_created_handler(sender, posts, **kwargs):
+    scopes = {('index',)}
+    for post in posts:
+        scopes.add(('author', post.author_id))
+        if post.group_id is not None:
+            scopes.add(('group', post.group_id))
+    for scope in scopes:
+        cache_versions.bump(*scope)
+    # Без id остаются посты из bulk_create(ignore_conflicts=True)
+    # и точные дубли (см. _fill_ids); они попадут в ленты и поиск
+    # после rebuild_timelines и rebuild_search_index
+    saved = [post for post in posts if post.pk is not None]
+    for post in saved:
+        timeline.fan_out(post)
+    search.index(saved)
+    authors = Counter(post.author_id for post in posts)
+    for author_id, count in authors.items():
+        stats.change(author_id, post_count=count)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    cache_versions.bump_post(instance)
+    search.unindex([instance.pk])
+    stats.change(instance.author_id, post_count=-1, create=False)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    cache_versions.bump('post', instance.post_id)
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def comments_bulk_created_handler(sender, comments, **kwargs):
+    for post_id in {comment.post_id for comment in comments}:
+        cache_versions.bump('post', post_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created and instance.user_id and instance.author_id:
+        timeline.backfill(instance.user_id, instance.author_id)
+        stats.change(instance.author_id, follower_count=1)
+
+
+@receiver(follows_bulk_created, sender=Follow)
+def follows_bulk_created_handler(sender, follows, **kwargs):
+    follows = [
+        follow for follow in follows if follow.user_id and follow.author_id
+    ]
+    for follow in follows:
+        timeline.backfill(follow.user_id, follow.author_id)
+    authors = Counter(follow.author_id for follow in follows)
+    for author_id, count in authors.items():
+        stats.change(author_id, follower_count=count)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if instance.user_id and instance.author_id:
+        timeline.trim(instance.user_id, instance.author_id)
+        stats.change(instance.author_id, follower_count=-1, create=False)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    cache_versions.bump('index')
+    cache_versions.bump('groups')
+    cache_versions.bump('group', instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=False, update_fields=None,
+                 **kwargs):
+    # Новый пользователь ещё ничего не публиковал, а вход в систему
+    # обновляет только last_login — ленты это не меняет
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    cache_versions.bump('index')
+    cache_versions.bump('author', instance.pk)
+    cache_versions.bump('user', instance.pk)
+    cache_versions.bump('users')
@@ -0,0 +1,77 @@
+"""
+Обращения к внутренностям sorl-thumbnail, собранные в одном месте.
+
+Бэкенду миниатюр нужно имя файла миниатюры без открытия картинки,
+а KV-хранилищу — пакетное чтение и запись сырых значений. Публичного
+API для этого в sorl нет, поэтому функции ниже повторяют устройство
+конкретной версии. Оно сверено с SUPPORTED_VERSIONS; на другой версии
+модуль не импортируется, пока адаптер не сверят с новым кодом sorl.
+"""
+import sorl
+from django.core.exceptions import ImproperlyConfigured
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+SUPPORTED_VERSIONS = ('12.7',)
+
+
+def check_version(version=sorl.__version__):
+    if '.'.join(version.split('.')[:2]) not in SUPPORTED_VERSIONS:
+        raise ImproperlyConfigured(
+            f'posts.sorl_compat проверен с sorl-thumbnail '
+            f'{", ".join(SUPPORTED_VERSIONS)}, установлена {version}'
+        )
+
+
+check_version()
+
+
+def thumbnail_name(backend, source, geometry, options):
+    """
+    Имя файла миниатюры, как его строит ThumbnailBackend.get_thumbnail:
+    те же умолчания опций, но без чтения самой картинки.
+    """
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry, options)
+
+
+def get_values(kvstore, keys, identity):
+    """
+    Сырые значения cached_db KV-хранилища по ключам: из кэша одним
+    get_many, недостающие — одним запросом к БД. Отсутствие тоже
+    кэшируется, как в KVStore._get_raw.
+    """
+    keys = {add_prefix(key, identity): key for key in keys}
+    values = kvstore.cache.get_many(list(keys))
+    missing = [key for key in keys if key not in values]
+    if missing:
+        rows = dict(KVStoreModel.objects.filter(
+            key__in=missing
+        ).values_list('key', 'value'))
+        fetched = {
+            key: rows.get(key, cached_db_kvstore.EMPTY_VALUE)
+            for key in missing
+        }
+        kvstore.cache.set_many(
+            fetched, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+        )
+        values.update(fetched)
+    return {
+        keys[key]: value for key, value in values.items()
+        if value != cached_db_kvstore.EMPTY_VALUE
+    }
+
+
+def set_value(kvstore, key, value, identity):
+    """Записывает значение под ключом с префиксом identity."""
+    kvstore._set(key, value, identity=identity)
@@ -0,0 +1,117 @@
+"""
+Денормализованные счётчики авторов: число постов и подписчиков.
+
+Счётчики меняются атомарным UPDATE ... SET n = n + delta из сигналов.
+Если записи для автора ещё нет, она создаётся по живым COUNT —
+сигналы приходят уже после изменения, поэтому дельту при этом
+применять не нужно.
+"""
+from itertools import chain
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import cache_versions
+from .models import AuthorStats, Follow, Post, User
+
+BATCH_SIZE = 1000
+# SQLite вставляет пакет через UNION ALL: не больше 500 строк
+INSERT_BATCH_SIZE = 500
+
+
+def _live_counts(author_id):
+    return {
+        'post_count': Post.objects.filter(author_id=author_id).count(),
+        'follower_count': Follow.objects.filter(author_id=author_id).count(),
+    }
+
+
+def _create(author_id):
+    try:
+        with transaction.atomic():
+            return AuthorStats.objects.create(
+                author_id=author_id, **_live_counts(author_id)
+            )
+    except IntegrityError:
+        # Запись успел создать параллельный запрос
+        return AuthorStats.objects.get(author_id=author_id)
+
+
+def change(author_id, post_count=0, follower_count=0, create=True):
+    """
+    Сдвигает счётчики автора на заданные дельты.
+    При удалениях create=False: запись могла быть удалена каскадом
+    вместе с автором, и создавать её заново нельзя.
+    """
+    if author_id is None:
+        return
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        post_count=F('post_count') + post_count,
+        follower_count=F('follower_count') + follower_count,
+    )
+    if not updated and create:
+        _create(author_id)
+    # Для Last-Modified страниц, где показаны счётчики
+    cache_versions.bump('stats', author_id)
+
+
+def for_author(author):
+    """Возвращает счётчики автора, создавая запись при первом обращении."""
+    try:
+        return AuthorStats.objects.get(author=author)
+    except AuthorStats.DoesNotExist:
+        return _create(author.pk)
+
+
+def _counter(model):
+    return Coalesce(Subquery(
+        model.objects.filter(author=OuterRef('pk')).order_by().values(
+            'author'
+        ).annotate(total=Count('id')).values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def reconcile(author_ids=None):
+    """
+    Сверяет счётчики с живыми данными и исправляет расхождения.
+    author_ids — сверить только этих авторов (например, после импорта).
+    Возвращает число исправленных записей.
+    """
+    authors = User.objects.annotate(
+        real_posts=_counter(Post),
+        real_followers=_counter(Follow),
+        stored_posts=F('stats__post_count'),
+        stored_followers=F('stats__follower_count'),
+    ).values_list(
+        'pk', 'real_posts', 'real_followers',
+        'stored_posts', 'stored_followers',
+    ).order_by('pk')
+    if author_ids is None:
+        rows = authors.iterator(chunk_size=BATCH_SIZE)
+    else:
+        author_ids = sorted(set(author_ids))
+        rows = chain.from_iterable(
+            authors.filter(pk__in=author_ids[start:start + BATCH_SIZE])
+            for start in range(0, len(author_ids), BATCH_SIZE)
+        )
+    to_create, to_update = [], []
+    for pk, posts, followers, stored_posts, stored_followers in rows:
+        stats = AuthorStats(
+            author_id=pk, post_count=posts, follower_count=followers
+        )
+        if stored_posts is None:
+            if posts or followers:
+                to_create.append(stats)
+        elif (posts, followers) != (stored_posts, stored_followers):
+            to_update.append(stats)
+    AuthorStats.objects.bulk_create(
+        to_create, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True
+    )
+    AuthorStats.objects.bulk_update(
+        to_update, ['post_count', 'follower_count'], batch_size=BATCH_SIZE
+    )
+    if to_create or to_update:
+        cache_versions.bump('stats')
+    return len(to_create) + len(to_update)
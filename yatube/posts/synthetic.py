@@ -0,0 +1,269 @@
+"""
+Синтетические данные для нагрузочных тестов и бенчмарков.
+
+Набор полностью определяется seed и размерами: пользователи,
+группы, посты за years лет до until, комментарии и подписки.
+Популярность авторов, групп и постов распределена по степенному
+закону: ранг выбирается как int(n ** random()), то есть
+P(ранг r) ∝ 1/r — немногие авторы собирают большинство подписчиков,
+а немногие посты — большинство комментариев.
+
+Тексты собираются из заранее сгенерированного Faker пула фраз
+(Faker на каждую строку слишком медленный), объекты вставляются
+bulk_create без сигналов, а производные данные пересобираются
+один раз — importer.rebuild(). Картинки рисуются в пуле процессов.
+"""
+import io
+import random
+from array import array
+from datetime import timedelta
+from itertools import islice
+from multiprocessing import Pool
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from faker import Faker
+from PIL import Image, ImageDraw
+
+from . import importer
+from .models import Comment, Follow, Group, Post, User
+
+LOCALE = 'ru_RU'
+PHRASES = 2000
+IMAGE_SIZE = (960, 650)
+IMAGE_DIR = 'posts/synthetic'
+# Нечётный множитель разбрасывает «горячие» ранги по всем постам,
+# а не только по самым старым
+SCATTER = 2654435761
+# Доля постов без группы
+NO_GROUP = 0.3
+# Попыток на одну подписку при выборе разных авторов
+FOLLOW_ATTEMPTS = 50
+
+
+def _rank(rng, size):
+    """Ранг 0..size-1 со степенным распределением: P(r) ∝ 1/(r + 1)."""
+    return min(int((size + 1) ** rng.random()), size) - 1
+
+
+def render_image(seed, index):
+    """Картинка поста: фон и несколько фигур, детерминированно по seed."""
+    rng = random.Random(f'{seed}:{index}')
+    image = Image.new('RGB', IMAGE_SIZE, tuple(
+        rng.randrange(256) for _ in range(3)
+    ))
+    draw = ImageDraw.Draw(image)
+    width, height = IMAGE_SIZE
+    for _ in range(rng.randint(3, 8)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        size = rng.randint(40, 300)
+        draw.ellipse(
+            (x, y, x + size, y + size),
+            fill=tuple(rng.randrange(256) for _ in range(3))
+        )
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+def _render(args):
+    return render_image(*args)
+
+
+class Generator:
+    """
+    Генерирует таблицы по очереди; id созданных пользователей, групп
+    и постов хранятся компактно, чтобы ссылаться на них дальше.
+    """
+
+    def __init__(self, seed, until, years=3, batch_size=importer.BATCH_SIZE,
+                 transaction_size=importer.TRANSACTION_SIZE, workers=0):
+        self.seed = seed
+        self.until = until
+        self.since = until - timedelta(days=365 * years)
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.workers = workers
+        self.rng = random.Random(seed)
+        faker = Faker(LOCALE)
+        faker.seed_instance(seed)
+        self.faker = faker
+        self.phrases = [faker.sentence() for _ in range(PHRASES)]
+        self.names = [
+            (faker.first_name(), faker.last_name()) for _ in range(PHRASES)
+        ]
+        self.user_ids = array('q')
+        self.group_ids = array('q')
+        self.post_ids = array('q')
+
+    def text(self, low, high):
+        return ' '.join(
+            self.rng.choice(self.phrases)
+            for _ in range(self.rng.randint(low, high))
+        )
+
+    def insert(self, model, objs, **options):
+        """Вставляет объекты транзакциями и отдаёт вставленные порции."""
+        objs = iter(objs)
+        while True:
+            chunk = list(islice(objs, self.transaction_size))
+            if not chunk:
+                return
+            with transaction.atomic():
+                if model in importer.DATE_FIELDS:
+                    importer.create_dated(model, chunk, self.batch_size)
+                else:
+                    model.objects.bulk_create(
+                        chunk, batch_size=self.batch_size, **options
+                    )
+            yield chunk
+
+    def ids(self, queryset, field, values):
+        """id строк по значениям уникального поля, в порядке values."""
+        ids = {}
+        for start in range(0, len(values), self.batch_size):
+            ids.update(queryset.filter(**{
+                f'{field}__in': values[start:start + self.batch_size]
+            }).values_list(field, 'id'))
+        return [ids[value] for value in values]
+
+    def users(self, count):
+        password = make_password(None)
+
+        def build(index):
+            first_name, last_name = self.rng.choice(self.names)
+            return User(
+                username=f'user{self.seed}_{index}', password=password,
+                first_name=first_name, last_name=last_name,
+            )
+
+        for chunk in self.insert(User, map(build, range(count))):
+            self.user_ids.extend(self.ids(
+                User.objects, 'username', [user.username for user in chunk]
+            ))
+        return len(self.user_ids)
+
+    def groups(self, count):
+        objs = (
+            Group(
+                title=self.faker.catch_phrase()[:200],
+                slug=f'group-{self.seed}-{i}',
+                description=self.text(1, 3),
+            ) for i in range(count)
+        )
+        for chunk in self.insert(Group, objs):
+            self.group_ids.extend(self.ids(
+                Group.objects, 'slug', [group.slug for group in chunk]
+            ))
+        return len(self.group_ids)
+
+    def post_date(self, index, count):
+        # Даты растут вместе с id, как у настоящих постов
+        span = (self.until - self.since) / count
+        return self.since + span * index
+
+    def images(self, posts, count):
+        """Имена картинок для count постов из posts, рисует недостающие."""
+        if not count:
+            return {}
+        step = max(posts // count, 1)
+        names = {
+            index: f'{IMAGE_DIR}/{self.seed}-{index}.jpg'
+            for index in range(0, posts, step)[:count]
+        }
+        missing = [
+            (self.seed, index) for index, name in names.items()
+            if not default_storage.exists(name)
+        ]
+        if self.workers:
+            with Pool(self.workers) as pool:
+                rendered = pool.imap(_render, missing, chunksize=16)
+                self._save_images(names, missing, rendered)
+        else:
+            self._save_images(names, missing, map(_render, missing))
+        return names
+
+    @staticmethod
+    def _save_images(names, missing, rendered):
+        for (_, index), data in zip(missing, rendered):
+            default_storage.save(names[index], ContentFile(data))
+
+    def posts(self, count, images=0):
+        users, groups = len(self.user_ids), len(self.group_ids)
+        if not count or not users:
+            return 0
+        images = self.images(count, images)
+
+        def build(index):
+            group_id = None
+            if groups and self.rng.random() > NO_GROUP:
+                group_id = self.group_ids[_rank(self.rng, groups)]
+            return Post(
+                text=self.text(1, 6),
+                author_id=self.user_ids[_rank(self.rng, users)],
+                group_id=group_id,
+                image=images.get(index, ''),
+                pub_date=self.post_date(index + self.rng.random(), count),
+            )
+
+        for chunk in self.insert(Post, map(build, range(count))):
+            self.post_ids.extend(
+                post.pk for post in chunk if post.pk is not None
+            )
+        return len(self.post_ids)
+
+    def comments(self, count):
+        posts, users = len(self.post_ids), len(self.user_ids)
+        if not posts or not users:
+            return 0
+
+        def build(_):
+            index = _rank(self.rng, posts) * SCATTER % posts
+            # Комментарий позже поста, но не позже until
+            created = min(
+                self.post_date(index + 1, posts) + timedelta(
+                    hours=self.rng.expovariate(1 / 24)
+                ),
+                self.until,
+            )
+            return Comment(
+                post_id=self.post_ids[index],
+                author_id=self.user_ids[self.rng.randrange(users)],
+                text=self.text(1, 2),
+                created=created,
+            )
+
+        return sum(map(len, self.insert(
+            Comment, map(build, range(count))
+        )))
+
+    def follows(self, per_user):
+        """
+        Подписки пользователя: от 0 до 2 * per_user разных авторов
+        (в среднем per_user). Популярные ранги выпадают повторно,
+        поэтому авторы тянутся без возвращения — до нужного числа
+        разных, с ограничением числа попыток на маленьких наборах.
+        """
+        users = len(self.user_ids)
+
+        def build():
+            for follower in range(users):
+                target = min(self.rng.randint(0, 2 * per_user), users - 1)
+                authors = set()
+                for _ in range(FOLLOW_ATTEMPTS * target):
+                    if len(authors) == target:
+                        break
+                    author = _rank(self.rng, users)
+                    if author != follower:
+                        authors.add(author)
+                for author in sorted(authors):
+                    yield Follow(
+                        user_id=self.user_ids[follower],
+                        author_id=self.user_ids[author],
+                    )
+
+        return sum(map(len, self.insert(
+            Follow, build(), ignore_conflicts=True, send_signal=False
+        )))
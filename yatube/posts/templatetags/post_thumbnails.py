@@ -0,0 +1,23 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 992px) 100vw, 960px'
+
+
+@register.simple_tag
+def load_thumbnails(posts, geometry, **options):
+    """
+    Находит миниатюры всех постов страницы одним запросом к хранилищу
+    и кладёт их в post.thumbnail.
+    """
+    thumbnails.attach(posts, geometry, **options)
+    return ''
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def responsive_image(image, css_class='', sizes=DEFAULT_SIZES):
+    """<picture> с WebP-источником и srcset по ширинам вариантов."""
+    return {'image': image, 'css_class': css_class, 'sizes': sizes}
@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.admin import PostAdmin  # isort:skip
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+from posts.paginators import EstimatedCountPaginator  # isort:skip
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            author = User.objects.create_user(
+                username=f'user{User.objects.count()}'
+            )
+            post = Post.objects.create(
+                text='Пост', author=author, group=self.group
+            )
+            Comment.objects.create(post=post, author=author, text='-')
+            Follow.objects.create(user=self.admin, author=author)
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:posts_{model}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for model in ('post', 'comment', 'follow'):
+            with self.subTest(model=model):
+                self.add_rows(2)
+                few = self.changelist_queries(model)
+                self.add_rows(10)
+                self.assertEqual(self.changelist_queries(model), few)
+
+    def test_foreign_keys_use_autocomplete(self):
+        self.add_rows(1)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(
+            response, f'<option value="{self.group.pk}" selected>Группа'
+        )
+
+    def test_changelist_after_deletes(self):
+        self.add_rows(6)
+        Post.objects.exclude(
+            pk=Post.objects.order_by('pk').last().pk
+        ).delete()
+        url = reverse('admin:posts_post_changelist')
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            # Оценка — 3 страницы, настоящая одна; p считается с нуля
+            response = self.client.get(url, {'p': 2})
+        self.assertEqual(response.status_code, 200)
+        cl = response.context['cl']
+        self.assertEqual(len(cl.result_list), 1)
+        self.assertEqual(cl.result_count, 1)
+        self.assertFalse(cl.multi_page)
+
+    def test_changelist_shows_count_limit(self):
+        self.add_rows(3)
+        with mock.patch.object(EstimatedCountPaginator, 'count_limit', 2):
+            response = self.client.get(
+                reverse('admin:posts_follow_changelist'),
+                {'user__id__exact': self.admin.pk},
+            )
+        self.assertContains(response, '2+ ')
+
+    def test_search_by_username(self):
+        self.add_rows(3)
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'user2'}
+        )
+        self.assertEqual(
+            [comment.author.username
+             for comment in response.context['cl'].result_list],
+            ['user2'],
+        )
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    def test_estimates(self):
+        user = User.objects.create_user(username='author')
+        posts = [Post.objects.create(text='Пост', author=user)
+                 for _ in range(5)]
+        posts[0].delete()
+
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, posts[-1].pk)
+
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=user), 2
+        )
+        paginator.count_limit = 3
+        self.assertEqual(paginator.count, 3)
+
+    def test_empty_trailing_page_is_clamped(self):
+        user = User.objects.create_user(username='author')
+        posts = [Post.objects.create(text='Пост', author=user)
+                 for _ in range(6)]
+        Post.objects.filter(pk__in=[post.pk for post in posts[:4]]).delete()
+
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.num_pages, 3)
+        page = paginator.page(3)
+        self.assertEqual(page.number, 1)
+        self.assertEqual(len(page), 2)
+        self.assertEqual((paginator.count, paginator.num_pages), (2, 1))
+
+    def test_count_limit_is_shown_as_lower_bound(self):
+        user = User.objects.create_user(username='author')
+        for _ in range(4):
+            Post.objects.create(text='Пост', author=user)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=user), 2
+        )
+        self.assertEqual(paginator.count_display, 4)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(author=user), 2
+        )
+        paginator.count_limit = 3
+        self.assertEqual(paginator.count_display, '3+')
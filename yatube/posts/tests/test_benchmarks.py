@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase, TestCase
+
+from posts import benchmarks
+from posts.models import Comment  # isort:skip
+
+
+class RunTests(TestCase):
+
+    def test_every_case_is_measured_and_rolled_back(self):
+        benchmarks.populate('small', seed=0)
+        comments = Comment.objects.count()
+        results = benchmarks.run(repeat=2, warmup=0)
+        self.assertEqual(
+            list(results), [case.name for case in benchmarks.CASES]
+        )
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p95_ms'])
+            self.assertGreaterEqual(metrics['queries'], 0)
+        self.assertGreater(results['posts:post_detail']['render_ms'], 0)
+        self.assertGreater(results['posts:index']['queries'], 0)
+        # Комментарии сценария add_comment откатываются
+        self.assertEqual(Comment.objects.count(), comments)
+
+
+class CompareTests(SimpleTestCase):
+
+    def results(self, p50, queries):
+        return {'scales': {'small': {'cases': {'posts:index': {
+            'p50_ms': p50, 'p95_ms': p50 * 3, 'queries': queries,
+        }}}}}
+
+    def test_regressions(self):
+        baseline = self.results(10.0, 3)
+        compare = benchmarks.compare
+        self.assertEqual(
+            compare(self.results(12.0, 3), baseline, 0.25, 1.0), []
+        )
+        self.assertEqual(
+            len(compare(self.results(14.0, 4), baseline, 0.25, 1.0)), 2
+        )
+        # Рост меньше min_delta_ms не считается, даже если он в разы
+        self.assertEqual(
+            compare(
+                self.results(0.3, 3), self.results(0.1, 3), 0.25, 1.0
+            ), []
+        )
+        self.assertEqual(
+            compare(self.results(50.0, 9), {'scales': {}}, 0.25, 1.0), []
+        )
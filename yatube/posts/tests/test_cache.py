@@ -4,7 +4,8 @@ from django.core.cache.utils import make_template_fragment_key
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from posts.models import Post  # isort:skip
+from posts import cache_versions  # isort:skip
+from posts.models import Follow, Group, Post  # isort:skip
 
 User = get_user_model()
 
@@ -37,7 +38,153 @@ class CacheTests(TestCase):
 
         self.assertIn(post_text, response.content.decode('utf-8'))
         page_obj = response.context.get('page_obj')
-        key = make_template_fragment_key('index_page', [page_obj.number])
+        key = make_template_fragment_key('index_page', [
+            page_obj.number,
+            response.context.get('page_key'),
+            response.context.get('cache_version'),
+        ])
+        self.assertIsNotNone(cache.get(key))
         cache.delete(key)
         response_1 = self.authorized_client.get(reverse('posts:index'))
         self.assertNotIn(post_text, response_1.content.decode('utf-8'))
+
+    def test_index_fragment_survives_without_events(self):
+        """
+        Без сигналов об изменениях фрагмент берётся из кэша:
+        правка в обход ORM-сигналов на странице не видна.
+        """
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        response = self.authorized_client.get(reverse('posts:index'))
+
+        self.assertContains(response, self.post.text)
+        self.assertNotContains(response, 'Тихая правка')
+
+    def test_index_fragment_invalidated_by_events(self):
+        """
+        Создание, правка и удаление поста, изменение группы
+        и автора сразу сбрасывают кэш главной страницы.
+        """
+        url = reverse('posts:index')
+        group = Group.objects.create(
+            title='Старое название', slug='group', description='-'
+        )
+        self.post.group = group
+        self.post.save()
+        self.assertContains(self.authorized_client.get(url), group.title)
+
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.authorized_client.get(url), group.title)
+
+        self.user.first_name = 'Стас'
+        self.user.save()
+        self.assertContains(self.authorized_client.get(url), 'Стас')
+
+        new_post = Post.objects.create(text='Свежий пост', author=self.user)
+        self.assertContains(self.authorized_client.get(url), new_post.text)
+
+        new_post.delete()
+        self.assertNotContains(self.authorized_client.get(url), 'Свежий пост')
+
+
+class FeedCacheTests(TestCase):
+    """
+    Фрагменты лент групп, профилей и подписок сбрасываются
+    только при изменениях, которые их касаются.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.other_author = User.objects.create_user(username='Other')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='-'
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая', slug='second', description='-'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Пост в первой группе', author=self.author, group=self.group
+        )
+        self.other_post = Post.objects.create(
+            text='Пост во второй группе',
+            author=self.other_author,
+            group=self.other_group
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.group_url = reverse('posts:group_list', args=(('first',)))
+        self.other_group_url = reverse('posts:group_list', args=(('second',)))
+        self.profile_url = reverse('posts:profile', args=(('Author',)))
+        self.other_profile_url = reverse('posts:profile', args=(('Other',)))
+        self.follow_url = reverse('posts:follow_index')
+
+    def get(self, url, client=None):
+        client = client or self.reader_client
+        return client.get(url).content.decode('utf-8')
+
+    def test_new_post_evicts_only_affected_feeds(self):
+        """Новый пост сбрасывает ленту своей группы, автора и подписчиков."""
+        for url in (self.group_url, self.other_group_url,
+                    self.profile_url, self.other_profile_url,
+                    self.follow_url):
+            self.get(url)
+        Post.objects.filter(pk=self.other_post.pk).update(text='Тихая правка')
+
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+
+        self.assertIn('Новый пост', self.get(self.group_url))
+        self.assertIn('Новый пост', self.get(self.profile_url))
+        self.assertIn('Новый пост', self.get(self.follow_url))
+        self.assertIn(self.other_post.text, self.get(self.other_group_url))
+        self.assertIn(self.other_post.text, self.get(self.other_profile_url))
+
+    def test_new_post_does_not_touch_follower_versions(self):
+        """
+        Рассылка поста не пишет версию ленты каждому подписчику:
+        ключ фрагмента меняет версия автора.
+        """
+        self.get(self.follow_url)
+        version = cache_versions.get_version('follower', self.reader.pk)
+
+        Post.objects.create(text='Новый пост', author=self.author)
+
+        self.assertEqual(
+            cache_versions.get_version('follower', self.reader.pk), version
+        )
+        self.assertIn('Новый пост', self.get(self.follow_url))
+
+    def test_post_edit_evicts_old_and_new_group(self):
+        """Перенос поста в другую группу через post_edit виден в обеих."""
+        for url in (self.group_url, self.other_group_url, self.follow_url):
+            self.get(url)
+
+        self.author_client.post(
+            reverse('posts:post_edit', args=((self.post.id,))),
+            data={'text': 'Перенесённый пост', 'group': self.other_group.id}
+        )
+
+        self.assertNotIn('Перенесённый пост', self.get(self.group_url))
+        self.assertIn('Перенесённый пост', self.get(self.other_group_url))
+        self.assertIn('Перенесённый пост', self.get(self.follow_url))
+
+    def test_post_delete_evicts_follow_feed(self):
+        """Удалённый пост пропадает из ленты подписок и профиля."""
+        self.get(self.follow_url)
+        self.get(self.profile_url)
+
+        self.post.delete()
+
+        self.assertNotIn(self.post.text, self.get(self.follow_url))
+        self.assertNotIn(self.post.text, self.get(self.profile_url))
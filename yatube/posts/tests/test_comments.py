@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post  # isort:skip
+
+User = get_user_model()
+
+
+class CommentPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.comments = [
+            Comment.objects.create(
+                post=self.post, author=self.user, text=f'Комментарий {i}'
+            )
+            for i in range(5)
+        ]
+
+    @mock.patch('posts.views.COMMENTS_PER_PAGE', 2)
+    def test_comments_load_in_pages(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,))
+        )
+        page_obj = response.context['comments']
+        seen = [comment.text for comment in page_obj]
+        self.assertEqual(seen, ['Комментарий 4', 'Комментарий 3'])
+
+        while page_obj.has_next():
+            response = self.client.get(
+                reverse('posts:post_comments', args=(self.post.id,)),
+                {'cursor': page_obj.paginator.next_cursor}
+            )
+            page_obj = response.context['page_obj']
+            seen += [comment.text for comment in page_obj]
+        self.assertEqual(
+            seen, [f'Комментарий {i}' for i in reversed(range(5))]
+        )
+        self.assertNotContains(response, 'data-load-more')
+
+    def test_first_page_is_cached_until_new_comment(self):
+        url = reverse('posts:post_detail', args=(self.post.id,))
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(
+            [q for q in queries if 'posts_comment' in q['sql']]
+        )
+
+        self.client.post(
+            reverse('posts:add_comment', args=(self.post.id,)),
+            {'text': 'Новый комментарий'}
+        )
+        self.assertContains(self.client.get(url), 'Новый комментарий')
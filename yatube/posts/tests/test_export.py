@@ -0,0 +1,108 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group,
+                image='posts/missing.jpg' if i == 0 else ''
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def export(self, *args, **options):
+        call_command(
+            'export_content', *args, output=self.directory, chunk_size=2,
+            stdout=StringIO(), **options
+        )
+
+    def read_ndjson(self, name, opener=open):
+        with opener(os.path.join(self.directory, name), 'rt',
+                    encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_ndjson_all_tables(self):
+        self.export(images=True)
+        posts = self.read_ndjson('post.ndjson')
+        self.assertEqual([row['id'] for row in posts],
+                         [post.id for post in self.posts])
+        self.assertEqual(posts[0]['author'], 'author')
+        self.assertEqual(posts[0]['group'], 'group')
+        self.assertEqual(
+            posts[0]['pub_date'], self.posts[0].pub_date.isoformat()
+        )
+        self.assertEqual(self.read_ndjson('comment.ndjson')[0]['post_id'],
+                         self.posts[0].id)
+        self.assertEqual(self.read_ndjson('follow.ndjson')[0]['user'],
+                         'reader')
+        self.assertEqual(len(self.read_ndjson('group.ndjson')), 1)
+        self.assertEqual(self.read_ndjson('images.ndjson'), [{
+            'post_id': self.posts[0].id,
+            'name': 'posts/missing.jpg',
+            'url': '/media/posts/missing.jpg',
+            'size': None,
+        }])
+
+    def test_gzip_csv(self):
+        self.export('post', format='csv', gzip=True)
+        path = os.path.join(self.directory, 'post.csv.gz')
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row['text'] for row in rows],
+                         [post.text for post in self.posts])
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory, 'comment.csv.gz'))
+        )
+
+    def test_incremental_export(self):
+        state = os.path.join(self.directory, 'state.json')
+        self.export('post', state=state)
+        new_post = Post.objects.create(text='Новый', author=self.author)
+        self.export('post', state=state)
+        self.assertEqual(
+            [row['id'] for row in self.read_ndjson('post.ndjson')],
+            [new_post.id]
+        )
+        with open(state) as file:
+            self.assertEqual(json.load(file), {'post': new_post.id})
+
+    def test_since(self):
+        since = self.posts[3].pub_date.isoformat()
+        self.export('post', since=since)
+        self.assertEqual(
+            [row['id'] for row in self.read_ndjson('post.ndjson')],
+            [self.posts[3].id, self.posts[4].id]
+        )
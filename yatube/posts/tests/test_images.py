@@ -0,0 +1,149 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from sorl.thumbnail import default
+
+from posts import images, thumbnails  # isort:skip
+from posts.forms import PostForm  # isort:skip
+from posts.models import Post  # isort:skip
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def make_image(name, size, mode='RGB', image_format='JPEG', **save_options):
+    buffer = io.BytesIO()
+    Image.new(mode, size).save(buffer, image_format, **save_options)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+def rotated_exif():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой
+    return exif.tobytes()
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, IMAGE_MAX_SIZE=64, BACKGROUND_WORKERS=0
+)
+class ImageIngestionTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, image):
+        with mock.patch.object(images, 'schedule'):
+            return Post.objects.create(
+                text='Пост', author=self.user, image=image
+            )
+
+    def open(self, post):
+        post.refresh_from_db()
+        with post.image.open() as file, Image.open(file) as image:
+            return image.format, image.size, dict(image.info)
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_form_rejects_huge_image_by_header(self):
+        form = PostForm(
+            data={'text': 'Пост'},
+            files={'image': make_image('big.jpg', (20, 20))},
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_photo_is_rotated_downsized_and_stripped(self):
+        post = self.create_post(make_image(
+            'photo.jpg', (200, 100), exif=rotated_exif()
+        ))
+        original = post.image.name
+
+        images.ingest(original, post.id)
+
+        image_format, size, info = self.open(post)
+        self.assertEqual(image_format, 'JPEG')
+        self.assertEqual(size, (32, 64))
+        self.assertNotIn('exif', info)
+        self.assertNotEqual(post.image.name, original)
+        self.assertFalse(post.image.storage.exists(original))
+        thumbnail = default.backend.thumbnail_file(
+            post.image.name, '960x339', {'crop': 'center', 'upscale': True}
+        )
+        self.assertIsNotNone(default.kvstore.get(thumbnail))
+
+    def test_transparent_image_stays_png(self):
+        post = self.create_post(make_image(
+            'logo.png', (128, 128), mode='RGBA', image_format='PNG'
+        ))
+        images.ingest(post.image.name, post.id)
+
+        image_format, size, _ = self.open(post)
+        self.assertEqual(image_format, 'PNG')
+        self.assertEqual(size, (64, 64))
+
+    def test_small_clean_image_is_kept(self):
+        post = self.create_post(make_image('small.png', (10, 10),
+                                           image_format='PNG'))
+        original = post.image.name
+        images.ingest(original, post.id)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, original)
+
+    def test_result_discarded_after_concurrent_edit(self):
+        post = self.create_post(make_image('photo.jpg', (200, 100)))
+        stale = post.image.name
+        replacement = self.create_post(make_image('new.jpg', (10, 10)))
+        Post.objects.filter(pk=post.pk).update(image=replacement.image.name)
+
+        with mock.patch.object(images.thumbnails, 'submit') as submit:
+            images.ingest(stale, post.id)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, replacement.image.name)
+        submit.assert_not_called()
+
+    def test_broken_file_is_logged(self):
+        post = self.create_post(SimpleUploadedFile(
+            'broken.jpg', b'not an image', 'image/jpeg'
+        ))
+        name = post.image.name
+        with self.assertLogs('posts.images', 'ERROR'):
+            images.ingest(name, post.id)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, name)
+
+    def test_thumbnails_go_through_lock(self):
+        post = self.create_post(make_image('small.png', (10, 10),
+                                           image_format='PNG'))
+        cache.add(thumbnails._lock_key(post.image.name), True)
+        with mock.patch.object(thumbnails.workers, 'submit') as submit:
+            images.ingest(post.image.name, post.id)
+        submit.assert_not_called()
+
+    def test_new_upload_is_scheduled(self):
+        with mock.patch.object(images, 'schedule') as schedule:
+            post = Post.objects.create(
+                text='Пост', author=self.user,
+                image=make_image('photo.jpg', (10, 10)),
+            )
+        schedule.assert_called_once_with(post.image.name, post.id)
@@ -0,0 +1,185 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts import importer, search, timeline
+from posts.models import (AuthorStats, Comment, Follow, Group,  # isort:skip
+                          Post, TimelineEntry)
+
+User = get_user_model()
+
+
+class ImportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, rows):
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return path
+
+    def run_import(self, *paths, **options):
+        call_command(
+            'import_content', *paths, stdout=StringIO(), **options
+        )
+
+    def test_round_trip_with_export(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        post = Post.objects.create(
+            text='Пост про котов', author=self.author, group=group
+        )
+        Comment.objects.create(post=post, author=self.reader, text='Ответ')
+        Follow.objects.create(user=self.reader, author=self.author)
+        call_command(
+            'export_content', output=self.directory, gzip=True,
+            stdout=StringIO()
+        )
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        group.delete()
+
+        self.run_import(self.directory)
+
+        imported = Post.objects.get()
+        self.assertEqual(imported.pub_date, post.pub_date)
+        self.assertEqual(imported.group.slug, 'group')
+        comment = Comment.objects.get()
+        self.assertEqual(
+            (comment.post, comment.author), (imported, self.reader)
+        )
+        # Производные данные пересобраны один раз после импорта
+        self.assertEqual(list(timeline.feed(self.reader)), [imported])
+        self.assertEqual(
+            list(search.search(Post.objects.all(), 'коты')), [imported]
+        )
+        stats = AuthorStats.objects.get(author=self.author)
+        self.assertEqual((stats.post_count, stats.follower_count), (1, 1))
+
+    def test_skips_invalid_rows_and_duplicate_follows(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.write('post.ndjson', [
+            {'id': 1, 'text': 'Пост', 'author': 'author'},
+            {'id': 2, 'text': 'Пост', 'author': 'missing'},
+            {'id': 3, 'text': 'Пост', 'author': 'author', 'group': 'none'},
+            {'id': 4, 'text': '', 'author': 'author'},
+            {'id': 5, 'text': 'Пост', 'author': 'author',
+             'pub_date': 'вчера'},
+        ])
+        self.write('follow.ndjson', [
+            {'user': 'reader', 'author': 'author'},
+            {'user': 'author', 'author': 'reader'},
+            {'user': 'author', 'author': 'reader'},
+            {'user': 'author', 'author': 'author'},
+        ])
+        self.run_import(self.directory)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(
+            set(Follow.objects.values_list('user__username', flat=True)),
+            {'reader', 'author'}
+        )
+
+    def test_comments_resolve_only_imported_posts(self):
+        local = Post.objects.create(text='Местный пост', author=self.author)
+        source_id = local.pk + 1
+        self.write('post.ndjson', [
+            {'id': source_id, 'text': 'Пост', 'author': 'author'},
+        ])
+        self.run_import(self.directory, source='community')
+        os.remove(os.path.join(self.directory, 'post.ndjson'))
+        imported = Post.objects.exclude(pk=local.pk).get()
+        self.write('comment.ndjson', [
+            {'post_id': source_id, 'text': 'К импортированному',
+             'author': 'reader'},
+            # Совпадает с id местного поста, но в источнике его нет
+            {'post_id': local.pk, 'text': 'Чужой', 'author': 'reader'},
+        ])
+
+        self.run_import(self.directory, source='community')
+
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post, imported)
+        self.assertFalse(local.comments.exists())
+
+    def test_repeated_posts_are_skipped(self):
+        path = self.write('post.ndjson', [
+            {'id': 1, 'text': 'Пост', 'author': 'author'},
+            {'id': 1, 'text': 'Пост', 'author': 'author'},
+        ])
+        self.run_import(path)
+        self.run_import(path)
+        self.assertEqual(Post.objects.count(), 1)
+        # Другой источник со своими id — отдельные посты
+        self.run_import(path, source='other')
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_create_users(self):
+        path = self.write('follow.ndjson.gz', [
+            {'user': 'new', 'author': 'author'},
+        ])
+        self.run_import(path)
+        self.assertFalse(Follow.objects.exists())
+        self.run_import(path, create_users=True)
+        follow = Follow.objects.get()
+        self.assertEqual(follow.user.username, 'new')
+        self.assertFalse(follow.user.has_usable_password())
+
+    def test_queries_do_not_grow_with_rows(self):
+        def count_queries(rows):
+            # Свой источник: посты прошлого вызова уже загружены
+            loader = importer.Importer(batch_size=50, source=str(rows))
+            with CaptureQueriesContext(connection) as queries:
+                loader.load('post', [
+                    {'id': i, 'text': 'Пост', 'author': 'author'}
+                    for i in range(rows)
+                ])
+            return len(queries)
+
+        self.assertEqual(count_queries(50), count_queries(1))
+
+    def test_rebuild_touches_only_imported_authors(self):
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.reader)
+        Post.objects.create(text='Чужой пост', author=self.reader)
+        # Ленту, не связанную с импортом, полная пересборка бы вернула
+        TimelineEntry.objects.filter(user=other).delete()
+        Follow.objects.create(user=self.reader, author=self.author)
+        loader = importer.Importer()
+        loader.load('post', [{'id': 1, 'text': 'Новый', 'author': 'author'}])
+        loader.rebuild()
+
+        self.assertEqual(
+            [post.text for post in timeline.feed(self.reader)], ['Новый']
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=other).exists())
+        self.assertEqual(AuthorStats.objects.get(
+            author=self.author
+        ).post_count, 1)
+
+    def test_unknown_file(self):
+        path = self.write('images.ndjson', [])
+        with self.assertRaises(CommandError):
+            self.run_import(path)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from posts.management.commands.bench_indexes import explain  # isort:skip
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+from posts.paginators import CursorPaginator  # isort:skip
+
+User = get_user_model()
+
+
+class FeedIndexTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Пост про индексы', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.reader, text='-')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def plan(self, queryset):
+        page = CursorPaginator(queryset, 10).get_page()
+        return ' '.join(explain(str(page.object_list.query)))
+
+    def test_feeds_are_read_in_index_order(self):
+        feeds = {
+            'post_date_idx': Post.objects.all(),
+            'post_author_date_idx': self.author.posts.all(),
+            'post_group_date_idx': self.group.posts.all(),
+        }
+        for index, queryset in feeds.items():
+            with self.subTest(index=index):
+                plan = self.plan(queryset)
+                self.assertIn(index, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_comments_and_followers_use_indexes(self):
+        plan = ' '.join(explain(str(self.post.comments.all().query)))
+        self.assertIn('comment_post_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        query = Follow.objects.filter(author=self.author).values('user')
+        self.assertIn(
+            'follow_author_user_idx', ' '.join(explain(str(query.query)))
+        )
+
+    def test_benchmark_restores_indexes(self):
+        out = StringIO()
+        call_command('bench_indexes', repeat=1, stdout=out)
+        output = out.getvalue()
+        for view in ('index', 'group_posts', 'profile', 'post_detail',
+                     'post_comments', 'follow_index', 'search'):
+            self.assertIn(view, output)
+        self.assertIn('post_author_date_idx', output)
+        self.assertIn('comment_post_created_idx', output)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = %s",
+                ['post_author_date_idx']
+            )
+            self.assertIsNotNone(cursor.fetchone())
@@ -1,5 +1,8 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 
 from ..models import Group, Post
 
@@ -30,3 +33,31 @@ class PostModelTest(TestCase):
         group = PostModelTest.group
         group_expected = group.title
         self.assertEqual(group_expected, str(group))
+
+
+class BulkCreateIdsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_ids_found_by_natural_key(self):
+        """id новых строк находятся по ключу, а не по порядку в таблице."""
+        explicit = Post(pk=1000, text='С id', author=self.user)
+        posts = [
+            Post(text='Первый', author=self.user),
+            explicit,
+            Post(text='Второй', author=self.user),
+        ]
+        Post.objects.bulk_create(posts)
+        for post in posts:
+            self.assertEqual(Post.objects.get(pk=post.pk).text, post.text)
+        self.assertEqual(explicit.pk, 1000)
+
+    def test_duplicates_get_no_id(self):
+        """Точным дублям id не присваивается — его нельзя доказать."""
+        now = timezone.now()
+        posts = [Post(text='Дубль', author=self.user) for _ in range(2)]
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            Post.objects.bulk_create(posts)
+        self.assertEqual([post.pk for post in posts], [None, None])
+        self.assertEqual(Post.objects.filter(text='Дубль').count(), 2)
@@ -0,0 +1,137 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import cache_versions  # isort:skip
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Первый пост', author=cls.user, group=cls.group
+        )
+        cls.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.user.username,)),
+            reverse('posts:post_detail', args=(cls.post.id,)),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_validators_and_not_modified(self):
+        """Анонимам отдаются ETag и Last-Modified, повтор — 304."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('ETag', response)
+                self.assertIn('Last-Modified', response)
+
+                by_etag = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(by_etag.status_code, 304)
+                self.assertEqual(by_etag['ETag'], response['ETag'])
+                by_date = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(by_date.status_code, 304)
+
+    def test_not_modified_skips_view(self):
+        url = self.urls[0]
+        etag = self.guest_client.get(url)['ETag']
+        # Состояние главной целиком в кэше: версия и время её смены
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_served_from_cache(self):
+        url = self.urls[0]
+        self.guest_client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Первый пост')
+
+    def test_changes_produce_new_etag(self):
+        """Новый пост, комментарий и подписка меняют ETag."""
+        changes = {
+            self.urls[0]: lambda: Post.objects.create(
+                text='Новый пост', author=self.reader
+            ),
+            self.urls[1]: lambda: self.user.save(),
+            self.urls[2]: lambda: Follow.objects.create(
+                user=self.reader, author=self.user
+            ),
+            self.urls[3]: lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий'
+            ),
+        }
+        for url, change in changes.items():
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                change()
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_edit_changes_last_modified(self):
+        """Правка, удаление и переименование сдвигают Last-Modified."""
+        later = time.time() + 10
+        changes = {
+            self.urls[0]: lambda: Post.objects.filter(
+                pk=self.post.pk
+            ).first().save(),
+            self.urls[1]: lambda: self.group.save(),
+            self.urls[2]: lambda: Follow.objects.create(
+                user=self.reader, author=self.user
+            ),
+            self.urls[3]: lambda: self.user.save(),
+        }
+        for url, change in changes.items():
+            with self.subTest(url=url):
+                modified = self.guest_client.get(url)['Last-Modified']
+                with mock.patch.object(
+                    cache_versions.time, 'time', return_value=later
+                ):
+                    change()
+                later += 10
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=modified
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['Last-Modified'], modified)
+
+    def test_authorized_client_bypasses_cache(self):
+        client = Client()
+        client.force_login(self.reader)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotIn('ETag', client.get(url))
+
+    def test_missing_object_is_not_cached(self):
+        response = self.guest_client.get(
+            reverse('posts:group_list', args=('missing',))
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from core.query_budget import get_query_budget  # isort:skip
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+
+User = get_user_model()
+# Малый и большой наборы данных: число запросов должно совпасть
+SMALL, LARGE = 1, 15
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Число запросов каждой страницы не зависит от количества постов,
+    комментариев и подписок и укладывается в бюджет, заданный
+    декоратором query_budget.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.reader)
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.author = User.objects.create_user(
+            username='Author', first_name='Имя'
+        )
+        cls.post = Post.objects.create(
+            text='Пост автора', author=cls.author, group=cls.group
+        )
+        cls.authors = 0
+
+    @classmethod
+    def seed(cls, count):
+        """Добавляет count авторов с постами, комментариями и подписками."""
+        for _ in range(count):
+            i = cls.authors
+            cls.authors += 1
+            author = User.objects.create_user(
+                username=f'Author{i}', first_name=f'Имя{i}'
+            )
+            group = Group.objects.create(
+                title=f'Группа {i}', slug=f'group_{i}', description='-'
+            )
+            Follow.objects.create(user=cls.reader, author=author)
+            post = Post.objects.create(
+                text=f'Пост {i}', author=author, group=group
+            )
+            Post.objects.create(
+                text=f'Пост в группе {i}', author=author, group=cls.group
+            )
+            Post.objects.create(text=f'Пост автора {i}', author=cls.author)
+            Comment.objects.create(
+                post=post, author=author, text=f'Комментарий {i}'
+            )
+            Comment.objects.create(
+                post=cls.post, author=author, text=f'Комментарий {i}'
+            )
+
+    def count_queries(self, urls):
+        counts = {}
+        for url in urls:
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(url)
+            counts[url] = queries.captured_queries
+        return counts
+
+    def test_views_fit_query_budget(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=((self.group.slug,))),
+            reverse('posts:profile', args=((self.author.username,))),
+            reverse('posts:post_detail', args=((self.post.id,))),
+            reverse('posts:post_comments', args=((self.post.id,))),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=Пост',
+        ]
+        self.seed(SMALL)
+        small = self.count_queries(urls)
+        self.seed(LARGE - SMALL)
+        large = self.count_queries(urls)
+        for url in urls:
+            with self.subTest(url=url):
+                budget = get_query_budget(resolve(url.split('?')[0]).func)
+                self.assertIsNotNone(budget)
+                self.assertEqual(len(large[url]), len(small[url]), '\n'.join(
+                    query['sql'] for query in large[url]
+                ))
+                self.assertLessEqual(len(large[url]), budget)
+
+    @override_settings(QUERY_BUDGET_LOG=True)
+    def test_middleware_logs_budget_overrun(self):
+        """При включённом QUERY_BUDGET_LOG превышение бюджета логируется."""
+        url = reverse('posts:index')
+        budget_view = resolve(url).func
+        budget = get_query_budget(budget_view)
+        budget_view.query_budget = 0
+        try:
+            with self.assertLogs('yatube.query_budget', 'WARNING') as logs:
+                Client().get(url)
+        finally:
+            budget_view.query_budget = budget
+        self.assertIn(url, logs.output[0])
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search  # isort:skip
+from posts.models import Post  # isort:skip
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+
+    def test_word_forms_share_stem(self):
+        forms = {
+            'кот': ['коты', 'котов', 'котами'],
+            'красив': ['красивая', 'красивые', 'красивого'],
+            'чита': ['читать', 'читаю', 'читали'],
+        }
+        for expected, words in forms.items():
+            for word in words:
+                with self.subTest(word=word):
+                    self.assertEqual(search.stem(word), expected)
+
+    def test_yo_and_latin(self):
+        self.assertEqual(search.stem('Ёлка'), search.stem('елка'))
+        self.assertEqual(search.stem('Django'), 'django')
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='author')
+        self.cats = Post.objects.create(
+            text='Коты любят спать. Кот спит весь день.', author=self.user
+        )
+        self.dogs = Post.objects.create(
+            text='Собаки гуляют, а кошки и коты смотрят.', author=self.user
+        )
+        Post.objects.create(text='Про погоду', author=self.user)
+
+    def find(self, query):
+        return list(search.search(Post.objects.all(), query))
+
+    def test_morphology_and_ranking(self):
+        """Находятся другие формы слова, чаще встречающиеся — выше."""
+        self.assertEqual(self.find('котами'), [self.cats, self.dogs])
+        self.assertEqual(self.find('собака коты'), [self.dogs])
+        self.assertEqual(self.find('слон'), [])
+        self.assertEqual(self.find('   '), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.find('"коты" OR NEAR('), [])
+        self.assertEqual(self.find('кот*'), [self.cats, self.dogs])
+
+    def test_index_follows_changes(self):
+        self.cats.text = 'Теперь про слонов'
+        self.cats.save()
+        self.assertEqual(self.find('слон'), [self.cats])
+        self.assertEqual(self.find('коты'), [self.dogs])
+
+        self.dogs.delete()
+        self.assertEqual(self.find('коты'), [])
+
+    def test_search_view(self):
+        for i in range(11):
+            Post.objects.create(text=f'Коты номер {i}', author=self.user)
+        response = self.client.get(reverse('posts:search'), {'q': 'кот'})
+
+        self.assertEqual(response.context['query'], 'кот')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 13)
+        self.assertEqual(len(page_obj.object_list), 10)
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%82&amp;page=2')
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котов'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.cats, self.dogs}
+        )
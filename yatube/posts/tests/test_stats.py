@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import AuthorStats, Follow, Post  # isort:skip
+
+User = get_user_model()
+
+
+class AuthorStatsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.follower = User.objects.create_user(username='Follower')
+        cls.guest_client = Client()
+
+    def stats(self):
+        return AuthorStats.objects.get(author=self.author)
+
+    def test_counters_follow_posts_and_follows(self):
+        """Счётчики меняются при создании и удалении постов и подписок."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Post.objects.create(text='Второй пост', author=self.author)
+        follow = Follow.objects.create(user=self.follower, author=self.author)
+        self.assertEqual(self.stats().post_count, 2)
+        self.assertEqual(self.stats().follower_count, 1)
+
+        post.delete()
+        follow.delete()
+        self.assertEqual(self.stats().post_count, 1)
+        self.assertEqual(self.stats().follower_count, 0)
+
+    def test_bulk_create_updates_counter(self):
+        """bulk_create постов тоже учитывается в счётчике."""
+        Post.objects.bulk_create(
+            [Post(text=f'Пост {i}', author=self.author) for i in range(3)]
+        )
+        self.assertEqual(self.stats().post_count, 3)
+
+    def test_profile_and_post_detail_use_stats(self):
+        """Страницы профиля и поста берут счётчики из статистики."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        AuthorStats.objects.filter(author=self.author).update(
+            post_count=42, follower_count=7
+        )
+        response = self.guest_client.get(
+            reverse('posts:profile', args=((self.author.username,))))
+        self.assertEqual(response.context['post_count'], 42)
+        self.assertEqual(response.context['followers_count'], 7)
+
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=((post.id,))))
+        self.assertEqual(response.context['post_count'], 42)
+
+    def test_reconcile_command_repairs_drift(self):
+        """Команда reconcile_author_stats исправляет расхождения."""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.author, author=self.follower)
+        AuthorStats.objects.filter(author=self.author).update(post_count=10)
+        AuthorStats.objects.filter(author=self.follower).delete()
+
+        call_command('reconcile_author_stats', stdout=StringIO())
+
+        self.assertEqual(self.stats().post_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.follower).follower_count, 1)
+
+    def test_reconcile_creates_many_records(self):
+        """Сверка создаёт записи пачками больше лимита INSERT SQLite."""
+        User.objects.bulk_create(
+            User(username=f'many{i}') for i in range(600)
+        )
+        authors = User.objects.filter(username__startswith='many')
+        Post.objects.bulk_create(
+            [Post(text='Пост', author=author) for author in authors],
+            send_signal=False,
+        )
+
+        call_command('reconcile_author_stats', stdout=StringIO())
+
+        self.assertEqual(
+            AuthorStats.objects.filter(
+                author__in=authors, post_count=1
+            ).count(),
+            600
+        )
@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, Follow, Group, Post  # isort:skip
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class GenerateDataTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def generate(self, **options):
+        call_command('generate_data', stdout=StringIO(), **{
+            'users': 50, 'groups': 3, 'posts': 300, 'comments': 500,
+            'follows_per_user': 5, 'images': 2, 'workers': 0,
+            'until': '2024-01-01T00:00:00', **options,
+        })
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('id').values_list(
+                'text', 'author__username', 'group__slug', 'pub_date',
+                'image'
+            )),
+            list(Comment.objects.order_by('id').values_list(
+                'post__text', 'author__username', 'created'
+            )),
+            list(Follow.objects.order_by('id').values_list(
+                'user__username', 'author__username'
+            )),
+        )
+
+    def test_sizes_and_dates(self):
+        self.generate()
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 500)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.exclude(image='').count(), 2)
+        dates = list(Post.objects.order_by('id').values_list(
+            'pub_date', flat=True
+        ))
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(dates[-1].year, 2023)
+        for comment in Comment.objects.select_related('post'):
+            self.assertGreaterEqual(comment.created, comment.post.pub_date)
+
+    def test_follows_per_user_is_the_mean(self):
+        # Повторы популярных рангов не должны занижать среднее
+        self.generate(
+            users=400, posts=10, comments=0, images=0, follows_per_user=20
+        )
+        mean = Follow.objects.count() / User.objects.count()
+        self.assertAlmostEqual(mean, 20, delta=2)
+
+    def test_same_seed_gives_same_data(self):
+        self.generate(skip_rebuild=True)
+        first = self.snapshot()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.generate(skip_rebuild=True)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_popularity_is_skewed(self):
+        self.generate()
+        followers = Counter(
+            Follow.objects.values_list('author_id', flat=True)
+        ).most_common()
+        top_share = sum(count for _, count in followers[:5])
+        self.assertGreater(top_share, Follow.objects.count() / 4)
+
+        comments = Post.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').values_list('total', flat=True)
+        self.assertGreater(comments[0], 10 * 500 / 300)
@@ -0,0 +1,177 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from posts import cache_versions, sorl_compat, thumbnails  # isort:skip
+from posts.models import Post  # isort:skip
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+TEMPLATE = Template(
+    '{% load thumbnail %}'
+    '{% thumbnail post.image "960x339" crop="center" upscale=True as im %}'
+    '{{ im.url }}'
+    '{% endthumbnail %}'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+
+    def render(self):
+        return TEMPLATE.render(Context({'post': self.post})).strip()
+
+    def test_placeholder_until_generated(self):
+        """Шаблон не создаёт миниатюру сам, а показывает заглушку."""
+        self.assertEqual(self.render(), settings.THUMBNAIL_DUMMY_SOURCE)
+
+        thumbnails.generate(self.post.image.name, self.post.id)
+        url = self.render()
+        self.assertNotEqual(url, settings.THUMBNAIL_DUMMY_SOURCE)
+        self.assertIn('cache/', url)
+
+    def test_generate_bumps_post_cache(self):
+        version = cache_versions.get_version('post', self.post.id)
+        thumbnails.generate(self.post.image.name, self.post.id)
+        self.assertNotEqual(
+            cache_versions.get_version('post', self.post.id), version
+        )
+
+        # Повторная задача ничего не создаёт и кэш не сбрасывает
+        version = cache_versions.get_version('post', self.post.id)
+        thumbnails.generate(self.post.image.name, self.post.id)
+        self.assertEqual(
+            cache_versions.get_version('post', self.post.id), version
+        )
+
+    def test_failed_generate_bumps_post_cache(self):
+        """Заглушка не остаётся в кэше страниц после неудачной задачи."""
+        version = cache_versions.get_version('post', self.post.id)
+        with mock.patch.object(
+            thumbnails, '_create_variants', side_effect=OSError
+        ):
+            thumbnails.generate(self.post.image.name, self.post.id)
+        self.assertNotEqual(
+            cache_versions.get_version('post', self.post.id), version
+        )
+        self.assertIsNone(cache.get(thumbnails._lock_key(
+            self.post.image.name
+        )))
+
+    def test_unsupported_sorl_version(self):
+        sorl_compat.check_version('12.7.0')
+        with self.assertRaises(ImproperlyConfigured):
+            sorl_compat.check_version('13.0')
+
+    def test_concurrent_jobs_are_deduplicated(self):
+        with mock.patch.object(thumbnails.workers, 'submit') as submit:
+            thumbnails.submit(self.post.image.name, self.post.id)
+            thumbnails.submit(self.post.image.name, self.post.id)
+            self.assertEqual(submit.call_count, 1)
+
+            thumbnails.generate(self.post.image.name, self.post.id)
+            thumbnails.submit(self.post.image.name, self.post.id)
+            self.assertEqual(submit.call_count, 2)
+
+    def test_post_save_schedules_thumbnails(self):
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.post.text = 'Правка'
+            self.post.save()
+        schedule.assert_called_once_with(
+            self.post.image.name, self.post.id
+        )
+
+    def test_attach_resolves_page_in_one_query(self):
+        """Миниатюры всей страницы ищутся одним запросом к БД."""
+        posts = [self.post] + [
+            Post.objects.create(
+                text=f'Пост {i}',
+                author=self.user,
+                image=SimpleUploadedFile(
+                    f'small{i}.gif', SMALL_GIF, 'image/gif'
+                ),
+            )
+            for i in range(3)
+        ]
+        for post in posts:
+            thumbnails.generate(post.image.name)
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            thumbnails.attach(posts, '960x339', crop='center', upscale=True)
+        with self.assertNumQueries(0):
+            thumbnails.attach(posts, '960x339', crop='center', upscale=True)
+        for post in posts:
+            self.assertIn('cache/', post.thumbnail.url)
+
+    def test_attach_placeholder_for_missing(self):
+        post = Post.objects.create(text='Без картинки', author=self.user)
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            thumbnails.attach([self.post, post], '960x339')
+        schedule.assert_called_once_with(self.post.image.name, self.post.id)
+        self.assertEqual(
+            self.post.thumbnail.url, settings.THUMBNAIL_DUMMY_SOURCE
+        )
+        self.assertFalse(hasattr(post, 'thumbnail'))
+
+    def test_variants_for_srcset(self):
+        """Для каждой ширины есть JPEG и WebP, src — самый широкий JPEG."""
+        thumbnails.generate(self.post.image.name, self.post.id)
+        thumbnails.attach([self.post], '960x339', crop='center', upscale=True)
+        image = self.post.thumbnail
+
+        self.assertEqual((image.width, image.height), (960, 339))
+        for srcset, extension in ((image.srcset, '.jpg'),
+                                  (image.webp_srcset, '.webp')):
+            widths = [item.split()[1] for item in srcset.split(', ')]
+            self.assertEqual(widths, ['480w', '720w', '960w'])
+            self.assertIn(extension, srcset)
+        self.assertTrue(image.srcset.endswith(f'{image.url} 960w'))
+
+    def test_picture_markup(self):
+        thumbnails.generate(self.post.image.name, self.post.id)
+        html = Template(
+            '{% load post_thumbnails %}'
+            '{% load_thumbnails post "960x339" crop="center" upscale=True %}'
+            '{% responsive_image post.thumbnail "card-img" %}'
+        ).render(Context({'post': self.post}))
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('sizes="', html)
+        self.assertIn(f'src="{self.post.thumbnail.url}"', html)
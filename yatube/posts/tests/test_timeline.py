@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, TimelineEntry  # isort:skip
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.client_reader = Client()
+        cls.client_reader.force_login(cls.reader)
+
+    def feed_texts(self):
+        response = self.client_reader.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост сразу попадает в ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Рассылка', author=self.author)
+
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertEqual(self.feed_texts(), [post.text])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """
+        При подписке лента заполняется старыми постами автора,
+        при отписке они из ленты удаляются.
+        """
+        old_post = Post.objects.create(text='Старый пост', author=self.author)
+        self.client_reader.get(reverse(
+            'posts:profile_follow', args=((self.author.username,))))
+        self.assertEqual(self.feed_texts(), [old_post.text])
+
+        self.client_reader.get(reverse(
+            'posts:profile_unfollow', args=((self.author.username,))))
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed_texts(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_posts_are_pulled_on_read(self):
+        """
+        Посты популярного автора не раскладываются по лентам,
+        а подтягиваются подписчиком при чтении ленты.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Популярный пост', author=self.author)
+
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=None, post=post).exists())
+        self.assertEqual(self.feed_texts(), [post.text])
+        self.assertEqual(self.feed_texts(), [post.text])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0, TIMELINE_BACKFILL=2)
+    def test_pull_does_not_lose_posts_beyond_limit(self):
+        """Новых постов больше TIMELINE_BACKFILL — подтягиваются все."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='Пост 0', author=self.author)
+        self.assertEqual(self.feed_texts(), ['Пост 0'])
+        for i in range(1, 6):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+
+        self.assertEqual(
+            self.feed_texts(), [f'Пост {i}' for i in range(5, -1, -1)]
+        )
+
+    def test_rebuild_timelines_command(self):
+        """Команда rebuild_timelines восстанавливает ленты по подпискам."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Пост', author=self.author)
+        TimelineEntry.objects.all().delete()
+
+        call_command('rebuild_timelines', stdout=StringIO())
+
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+
+    @override_settings(TIMELINE_BACKFILL=2)
+    def test_rebuild_keeps_latest_posts_of_each_author(self):
+        """
+        Пересборка кладёт в ленту последние TIMELINE_BACKFILL постов
+        автора и с --user-id не трогает чужие ленты.
+        """
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(3)
+        ]
+        TimelineEntry.objects.filter(user=self.reader).delete()
+        TimelineEntry.objects.filter(user=other, post=posts[2]).delete()
+
+        call_command(
+            'rebuild_timelines', user_id=self.reader.pk, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            self.feed_texts(), [posts[2].text, posts[1].text]
+        )
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=other, post=posts[2]).exists())
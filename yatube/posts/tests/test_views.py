@@ -2,11 +2,14 @@ from http import HTTPStatus
 
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.models.query import QuerySet
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Group, Post, Follow  # isort:skip
+from posts.paginators import CursorPaginator  # isort:skip
 from posts.tests.utils import divide  # isort:skip
 
 FIRST_PAGE_POSTS_COUNT = 10
@@ -330,6 +333,112 @@ class PaginatorViewsTest(TestCase):
         self.assertEqual(len(page_obj), FIRST_PAGE_POSTS_COUNT)
         self.assertEqual(len(second_page_obj), remainder)
 
+    def test_index_cursor_pagination(self):
+        """
+        Проверяем keyset-паджинацию: по курсорам next/prev
+        страницы идут без пропусков и повторов,
+        а испорченный курсор возвращает первую страницу.
+        """
+        url = reverse('posts:index')
+        response = self.authorized_client.get(url)
+        first_page = response.context.get('page_obj')
+        first_ids = [post.id for post in first_page]
+        next_cursor = first_page.paginator.next_cursor
+
+        response_2 = self.authorized_client.get(
+            url, {'cursor': next_cursor})
+        second_page = response_2.context.get('page_obj')
+        second_ids = [post.id for post in second_page]
+        expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)[:FIRST_PAGE_POSTS_COUNT * 2]
+        )
+
+        self.assertIsNone(first_page.paginator.previous_cursor)
+        self.assertEqual(second_page.number, 2)
+        self.assertTrue(second_page.has_previous())
+        self.assertEqual(first_ids + second_ids, expected_ids)
+
+        response_back = self.authorized_client.get(
+            url, {'cursor': second_page.paginator.previous_cursor})
+        back_page = response_back.context.get('page_obj')
+        self.assertEqual([post.id for post in back_page], first_ids)
+        self.assertFalse(back_page.has_previous())
+
+        response_bad = self.authorized_client.get(
+            url, {'cursor': next_cursor[:-3] + 'abc'})
+        bad_page = response_bad.context.get('page_obj')
+        self.assertEqual([post.id for post in bad_page], first_ids)
+
+    def test_cursor_pagination_last_page(self):
+        """Последняя страница по курсорам не имеет следующей."""
+        url = reverse('posts:group_list', args=((self.second_group.slug,)))
+        response = self.authorized_client.get(url)
+        page_obj = response.context.get('page_obj')
+        response_2 = self.authorized_client.get(
+            url, {'cursor': page_obj.paginator.next_cursor})
+        last_page = response_2.context.get('page_obj')
+
+        self.assertEqual(
+            len(last_page),
+            divide(self.second_group_posts_count, FIRST_PAGE_POSTS_COUNT)
+        )
+        self.assertFalse(last_page.has_next())
+        self.assertIsNone(last_page.paginator.next_cursor)
+        self.assertEqual(
+            last_page.end_index(), self.second_group_posts_count
+        )
+
+    def test_cursor_page_keeps_prefetch_related(self):
+        """Страница — вычисленный QuerySet с выполненным prefetch_related."""
+        paginator = CursorPaginator(
+            Post.objects.prefetch_related('comments'),
+            FIRST_PAGE_POSTS_COUNT
+        )
+        page_obj = paginator.get_page()
+        self.assertIsInstance(page_obj.object_list, QuerySet)
+        with self.assertNumQueries(0):
+            for post in page_obj:
+                list(post.comments.all())
+
+    def test_legacy_page_links(self):
+        """
+        ?page=N на первых страницах работает без COUNT(*), а дальше
+        открывается первая страница вместо глубокого OFFSET.
+        """
+        url = reverse('posts:index')
+        expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)[:FIRST_PAGE_POSTS_COUNT * 2]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, {'page': 2})
+        page_obj = response.context.get('page_obj')
+        self.assertEqual(
+            [post.id for post in page_obj],
+            expected_ids[FIRST_PAGE_POSTS_COUNT:]
+        )
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(page_obj.start_index(), FIRST_PAGE_POSTS_COUNT + 1)
+        self.assertEqual(page_obj.end_index(), FIRST_PAGE_POSTS_COUNT * 2)
+        self.assertIsNotNone(page_obj.paginator.next_cursor)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, {'page': 50000})
+        page_obj = response.context.get('page_obj')
+        self.assertEqual(page_obj.number, 1)
+        self.assertEqual(
+            [post.id for post in page_obj],
+            expected_ids[:FIRST_PAGE_POSTS_COUNT]
+        )
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] or 'OFFSET' in query['sql']
+            for query in queries.captured_queries
+        ))
+
 
 class FollowViewsTest(TestCase):
 
@@ -0,0 +1,221 @@
+"""
+Миниатюры картинок постов создаются заранее в фоновом пуле
+(core.workers).
+
+Бэкенд EagerThumbnailBackend подключается через THUMBNAIL_BACKEND и
+заменяет ленивую генерацию {% thumbnail %}: если миниатюры ещё нет
+в KV-хранилище sorl, шаблон получает заглушку
+(THUMBNAIL_DUMMY_SOURCE), а создание ставится в очередь.
+После сохранения поста в очередь сразу ставятся все размеры из
+GEOMETRIES. Одна картинка обрабатывается одной задачей: повторные
+постановки отсекает блокировка в кэше. Когда миниатюры готовы,
+сбрасываются версии кэша поста, и вместо заглушки появляется картинка.
+
+Для каждого базового размера создаются варианты шириной
+VARIANT_WIDTHS в форматах VARIANT_FORMATS (JPEG и WebP) для srcset
+и <picture>. Имена файлов всех вариантов картинки хранятся одной
+записью KV-хранилища, поэтому attach() находит варианты всех постов
+страницы одним обращением к кэшу (get_many) и максимум одним запросом
+к БД — через KVStore, который подключается в THUMBNAIL_KVSTORE.
+Всё, что опирается на внутреннее устройство sorl, вынесено
+в posts.sorl_compat.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.helpers import deserialize, serialize, tokey
+from sorl.thumbnail.images import DummyImageFile, ImageFile
+from sorl.thumbnail.kvstores import cached_db_kvstore
+
+from core import server_timing, workers
+
+from . import cache_versions, sorl_compat
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Размеры, которые используют шаблоны постов
+GEOMETRIES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+    ('960x650', {'crop': 'center', 'upscale': True}),
+)
+# Ширины вариантов для srcset (не больше ширины базового размера)
+VARIANT_WIDTHS = (480, 720, 960)
+VARIANT_FORMATS = ('JPEG', 'WEBP')
+LOCK_PREFIX = 'posts:thumbnail'
+
+
+def _lock_key(name):
+    return f'{LOCK_PREFIX}:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+class KVStore(cached_db_kvstore.KVStore):
+    """KV-хранилище sorl (кэш + БД) с пакетным чтением вариантов."""
+
+    def get_variants(self, keys):
+        """{ключ: запись вариантов} для найденных ключей."""
+        return {
+            key: deserialize(value)
+            for key, value in sorl_compat.get_values(
+                self, keys, 'variants'
+            ).items()
+        }
+
+    def set_variants(self, key, record):
+        sorl_compat.set_value(self, key, record, 'variants')
+
+
+class EagerThumbnailBackend(ThumbnailBackend):
+
+    def thumbnail_file(self, file_, geometry_string, options):
+        """Файл миниатюры без обращения к картинке — как в sorl."""
+        name = sorl_compat.thumbnail_name(
+            self, ImageFile(file_), geometry_string, options
+        )
+        return ImageFile(name, default.storage)
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not file_:
+            return super().get_thumbnail(file_, geometry_string, **options)
+        thumbnail = self.thumbnail_file(file_, geometry_string, options)
+        cached = default.kvstore.get(thumbnail)
+        if cached:
+            return cached
+        post = getattr(file_, 'instance', None)
+        schedule(str(file_), getattr(post, 'pk', None))
+        return DummyImageFile(geometry_string)
+
+    def create_thumbnail(self, file_, geometry_string, **options):
+        """Ленивая генерация sorl: вызывается только из задачи."""
+        return super().get_thumbnail(file_, geometry_string, **options)
+
+
+class ResponsiveImage:
+    """Варианты одной миниатюры: src, srcset и источники <picture>."""
+
+    def __init__(self, size, sources):
+        self.width, self.height = size
+        self.sources = sources
+
+    @classmethod
+    def placeholder(cls, geometry):
+        return cls(DummyImageFile(geometry).size, {})
+
+    def _srcset(self, image_format):
+        return ', '.join(
+            f'{default.storage.url(name)} {width}w'
+            for name, width in self.sources.get(image_format, [])
+        )
+
+    @property
+    def url(self):
+        if not self.sources:
+            return thumbnail_settings.THUMBNAIL_DUMMY_SOURCE
+        name, _ = self.sources['JPEG'][-1]
+        return default.storage.url(name)
+
+    @property
+    def srcset(self):
+        return self._srcset('JPEG')
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('WEBP')
+
+
+def variants_key(file_, geometry, options):
+    return tokey(ImageFile(file_).key, geometry, serialize(options))
+
+
+def _create_variants(name, geometry, options):
+    base_width, base_height = map(int, geometry.split('x'))
+    sources = {}
+    for image_format in VARIANT_FORMATS:
+        sources[image_format] = []
+        for width in VARIANT_WIDTHS:
+            if width > base_width:
+                continue
+            height = round(base_height * width / base_width)
+            thumbnail = default.backend.create_thumbnail(
+                name, f'{width}x{height}', format=image_format, **options
+            )
+            sources[image_format].append([thumbnail.name, thumbnail.width])
+    return {'size': [base_width, base_height], 'sources': sources}
+
+
+def attach(posts, geometry, **options):
+    """
+    Кладёт в post.thumbnail варианты миниатюры (ResponsiveImage)
+    или заглушку для каждого поста.
+    """
+    if isinstance(posts, Post):
+        posts = [posts]
+    posts = [post for post in posts if post.image]
+    if not posts:
+        return
+    with server_timing.measure('thumb'):
+        keys = {
+            post.pk: variants_key(post.image, geometry, options)
+            for post in posts
+        }
+        found = default.kvstore.get_variants(keys.values())
+        for post in posts:
+            record = found.get(keys[post.pk])
+            if record is None:
+                schedule(post.image.name, post.pk)
+                post.thumbnail = ResponsiveImage.placeholder(geometry)
+            else:
+                post.thumbnail = ResponsiveImage(**record)
+
+
+def generate(name, post_id=None):
+    """
+    Создаёт недостающие варианты миниатюр и обновляет страницы поста.
+    Страницы сбрасываются и при ошибке: иначе заглушка держалась бы
+    в кэше FEED_CACHE_TIMEOUT, а так следующий показ поставит задачу
+    заново.
+    """
+    changed = False
+    try:
+        keys = {
+            variants_key(name, geometry, options): (geometry, options)
+            for geometry, options in GEOMETRIES
+        }
+        found = default.kvstore.get_variants(keys)
+        missing = [key for key in keys if key not in found]
+        changed = bool(missing)
+        # Замеряется, только если задача выполняется в запросе
+        with server_timing.measure('thumb'):
+            for key in missing:
+                geometry, options = keys[key]
+                default.kvstore.set_variants(
+                    key, _create_variants(name, geometry, options)
+                )
+    except Exception:
+        changed = True
+        logger.exception('Не удалось создать миниатюры %s', name)
+    finally:
+        cache.delete(_lock_key(name))
+    if changed and post_id is not None:
+        post = Post.objects.filter(pk=post_id).first()
+        if post is not None:
+            cache_versions.bump_post(post)
+
+
+def submit(name, post_id=None):
+    """Ставит задачу сразу; повторную для картинки отсекает блокировка."""
+    if not cache.add(_lock_key(name), True, settings.THUMBNAIL_JOB_TIMEOUT):
+        return
+    workers.submit(generate, name, post_id)
+
+
+def schedule(name, post_id=None):
+    """Ставит картинку в очередь после фиксации транзакции."""
+    server_timing.count('thumb_queued')
+    transaction.on_commit(lambda: submit(name, post_id))
@@ -0,0 +1,207 @@
+"""
+Лента подписок с рассылкой при записи (fan-out-on-write).
+
+Новый пост сразу раскладывается по лентам подписчиков автора.
+У популярных авторов (подписчиков больше TIMELINE_FANOUT_LIMIT)
+вместо этого пишется одна широковещательная запись с user=None,
+а подписчики подтягивают такие посты к себе при чтении ленты
+(в фоне, см. schedule_pull).
+Чтение ленты — один диапазонный проход по индексу
+(user, -pub_date, -post) таблицы TimelineEntry.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+from core import workers
+
+from . import cache_versions
+from .models import Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+REBUILD_SQL = """
+    INSERT INTO {entry} (user_id, post_id, author_id, pub_date, pulled)
+    SELECT follow.user_id, post.id, post.author_id, post.pub_date, %s
+    FROM {follow} AS follow
+    JOIN (
+        SELECT id, author_id, pub_date, ROW_NUMBER() OVER (
+            PARTITION BY author_id ORDER BY pub_date DESC, id DESC
+        ) AS position
+        FROM {post}
+    ) AS post ON post.author_id = follow.author_id
+    WHERE follow.user_id IS NOT NULL AND post.position <= %s {where}
+"""
+
+
+def _entry(user_id, post, pulled=False):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post.id,
+        author_id=post.author_id,
+        pub_date=post.pub_date,
+        pulled=pulled,
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if post.author_id is None:
+        return
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    followers = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id', flat=True
+        )[:limit + 1]
+    )
+    if len(followers) > limit:
+        TimelineEntry.objects.create(
+            user=None,
+            post=post,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        return
+    # Версии ('follower', id) не сбрасываются: в ключ фрагмента ленты
+    # входят версии авторов всех постов страницы, а bump_post уже
+    # сбросил версию автора — иначе до TIMELINE_FANOUT_LIMIT записей
+    # в кэш на каждый пост
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for user_id in followers],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту свежие посты автора после подписки."""
+    posts = Post.objects.filter(author_id=author_id).only(
+        'id', 'author_id', 'pub_date'
+    )[:settings.TIMELINE_BACKFILL]
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for post in posts],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    cache_versions.bump('follower', user_id)
+
+
+def trim(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+    cache_versions.bump('follower', user_id)
+
+
+def pull(user_id):
+    """
+    Подтягивает в ленту посты популярных авторов, которых в ней ещё нет.
+    Граница — самый поздний уже подтянутый пост; от неё посты идут
+    по возрастанию даты порциями по TIMELINE_BACKFILL, пока не кончатся,
+    так что при большом числе новых постов старые не теряются.
+    Первое чтение подтягивает, как и backfill, только свежие посты.
+    """
+    authors = Follow.objects.filter(user_id=user_id).values('author_id')
+    own_posts = TimelineEntry.objects.filter(
+        user_id=user_id
+    ).values('post_id')
+    broadcasts = TimelineEntry.objects.filter(
+        user=None, author_id__in=authors
+    ).exclude(post_id__in=own_posts)
+    watermark = TimelineEntry.objects.filter(
+        user_id=user_id, pulled=True
+    ).aggregate(watermark=Max('pub_date'))['watermark']
+    limit = settings.TIMELINE_BACKFILL
+    if watermark is None:
+        broadcasts = broadcasts.order_by('-pub_date', '-post_id')
+        _pull_page(user_id, broadcasts[:limit])
+        return
+    # Уже подтянутые посты исключены выше, поэтому граница
+    # включительно: посты с той же датой не пропадут
+    broadcasts = broadcasts.filter(
+        pub_date__gte=watermark
+    ).order_by('pub_date', 'post_id')
+    while _pull_page(user_id, broadcasts[:limit]) == limit:
+        pass
+
+
+def _pull_page(user_id, broadcasts):
+    entries = [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=entry.post_id,
+            author_id=entry.author_id,
+            pub_date=entry.pub_date,
+            pulled=True,
+        )
+        for entry in broadcasts
+    ]
+    if entries:
+        # Как и в fan_out: версии авторов этих постов уже сброшены
+        TimelineEntry.objects.bulk_create(
+            entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+        )
+    return len(entries)
+
+
+def schedule_pull(user_id):
+    """
+    pull() в пуле фоновых задач: чтение ленты ничего не пишет
+    в запросе, новые посты появляются к следующему чтению.
+    """
+    workers.submit(pull, user_id)
+
+
+def feed(user):
+    """
+    Посты ленты пользователя в порядке (feed_date, feed_id) по убыванию.
+    Сортировка и курсор идут по колонкам TimelineEntry,
+    поэтому выборка страницы покрывается индексом ленты.
+    """
+    return Post.objects.filter(timeline_entries__user=user).annotate(
+        feed_date=F('timeline_entries__pub_date'),
+        feed_id=F('timeline_entries__post_id'),
+    ).order_by('-feed_date', '-feed_id')
+
+
+def rebuild(user_ids=None):
+    """
+    Пересобирает ленты по текущим подпискам — в одной транзакции,
+    чтобы читатели не увидели пустых лент. Вместо backfill() на каждую
+    подписку — один INSERT ... SELECT: последние TIMELINE_BACKFILL
+    постов каждого автора выбирает оконная функция.
+    user_ids — только ленты этих пользователей, порциями
+    по BATCH_SIZE (каждая порция — своя транзакция).
+    """
+    if user_ids is None:
+        return _rebuild(None)
+    user_ids = sorted(set(user_ids))
+    return sum(
+        _rebuild(user_ids[start:start + BATCH_SIZE])
+        for start in range(0, len(user_ids), BATCH_SIZE)
+    )
+
+
+def _rebuild(user_ids):
+    follows = Follow.objects.exclude(user=None).exclude(author=None)
+    entries = TimelineEntry.objects.exclude(user=None)
+    where, params = '', [False, settings.TIMELINE_BACKFILL]
+    if user_ids is not None:
+        follows = follows.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+        where = 'AND follow.user_id IN ({})'.format(
+            ', '.join(['%s'] * len(user_ids))
+        )
+        params.extend(user_ids)
+    with transaction.atomic():
+        entries.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL.format(
+                entry=TimelineEntry._meta.db_table,
+                follow=Follow._meta.db_table,
+                post=Post._meta.db_table,
+                where=where,
+            ), params)
+    for follower_id in follows.values_list('user_id', flat=True).distinct():
+        cache_versions.bump('follower', follower_id)
+    return follows.count()
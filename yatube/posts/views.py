@@ -2,74 +2,133 @@ from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from yatube.settings import PAGE_COEF
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import urlencode
+from core.page_cache import anonymous_page_cache
+from core.query_budget import query_budget
+from yatube.settings import (COMMENTS_PER_PAGE, FEED_CACHE_TIMEOUT,
+                             LEGACY_PAGE_LIMIT, PAGE_COEF)
 
+from . import cache_versions, page_state, stats, timeline
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Comment, Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .search import search as search_posts
+
+
+def legacy_page_number(request):
+    """
+    Номер из старой ссылки ?page=N, если он не больше LEGACY_PAGE_LIMIT.
+    Глубже OFFSET дорог, поэтому такие ссылки ведут на первую страницу.
+    """
+    try:
+        number = int(request.GET['page'])
+    except (KeyError, ValueError):
+        return None
+    return number if 1 < number <= LEGACY_PAGE_LIMIT else None
 
 
 # Вынес paginator  в отдельную функцию
-def pagination(request, object, coef):
-    paginator = Paginator(object, coef)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+def pagination(request, object, coef, **cursor_fields):
+    paginator = CursorPaginator(object, coef, **cursor_fields)
+    page_number = legacy_page_number(request)
+    if page_number is not None:
+        return paginator.get_page_number(page_number)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def feed_cache_context(request, *scopes):
+    """
+    Параметры {% cache %} для ленты: общая версия областей кэша
+    и положение страницы (курсор или номер).
+    """
+    return {
+        'cache_timeout': FEED_CACHE_TIMEOUT,
+        'cache_version': cache_versions.get_versions(scopes),
+        'page_key': (
+            request.GET.get('cursor') or legacy_page_number(request) or ''
+        ),
+    }
+
+
+def comment_page(post_id, cursor=None):
+    """Страница комментариев поста, от новых к старым."""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    )
+    paginator = CursorPaginator(
+        comments, COMMENTS_PER_PAGE, date_field='created'
+    )
+    return paginator.get_page(cursor)
 
 
 # Главная страница
 
+@anonymous_page_cache(page_state.index_state)
+@query_budget(4)
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all()
+    post_list = Post.objects.select_related('author', 'group')
     page_obj = pagination(request, post_list, PAGE_COEF)
     context = {
         'page_obj': page_obj,
+        **feed_cache_context(request, ('index',)),
     }
     return render(request, template, context)
 
 
 # Посты по группам
 
+@anonymous_page_cache(page_state.group_state)
+@query_budget(5)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.select_related('author')
     page_obj = pagination(request, posts, PAGE_COEF)
     context = {
         'page_obj': page_obj,
-        'group': group
+        'group': group,
+        **feed_cache_context(
+            request, ('group', group.id),
+            *[('user', post.author_id) for post in page_obj.object_list]
+        ),
     }
     return render(request, template, context)
 
 
+@anonymous_page_cache(page_state.profile_state)
+@query_budget(7)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    post_count = post_list.count()
+    post_list = author.posts.select_related('group')
+    author_stats = stats.for_author(author)
     user = request.user
     page_obj = pagination(request, post_list, PAGE_COEF)
     if user.is_authenticated and author.following.filter(user=user).exists():
         following = True
     else:
         following = False
-    followers_count = author.following.count()
     context = {
-        'post_count': post_count,
+        'post_count': author_stats.post_count,
         'author': author,
         'page_obj': page_obj,
         'following': following,
-        'followers_count': followers_count
-
+        'followers_count': author_stats.follower_count,
+        **feed_cache_context(request, ('author', author.id), ('groups',)),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@anonymous_page_cache(page_state.post_detail_state)
+@query_budget(6)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
     author = post.author
     post_list = author.posts
-    post_count = post_list.count()
-    self_comments = post.comments.all()
+    post_count = stats.for_author(author).post_count
     comment_form = CommentForm(request.POST or None)
     context = {
         'post': post,
@@ -77,12 +136,43 @@ def post_detail(request, post_id):
         'post_list': post_list,
         'author': author,
         'form': comment_form,
-        'comments': self_comments
-
+        # Первая страница читается, только если её нет в кэше фрагментов
+        'comments': SimpleLazyObject(lambda: comment_page(post.id)),
+        'cache_timeout': FEED_CACHE_TIMEOUT,
+        'comments_cache_version': cache_versions.get_versions(
+            [('post', post.id), ('users',)]
+        ),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(4)
+def post_comments(request, post_id):
+    """HTML-фрагмент со следующей порцией комментариев."""
+    page_obj = comment_page(post_id, request.GET.get('cursor'))
+    context = {
+        'page_obj': page_obj,
+        'post_id': post_id,
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
+@query_budget(4)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    results = search_posts(
+        Post.objects.select_related('author', 'group'), query
+    )
+    # Результаты упорядочены по релевантности — страницы по номерам
+    page_obj = Paginator(results, PAGE_COEF).get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -134,15 +224,24 @@ def add_comment(request, post_id):
 
 
 @login_required
+@query_budget(7)
 def follow_index(request):
     # информация о текущем пользователе доступна в переменной request.user
-    following_posts = Post.objects.all().filter(
-        author__following__user=request.user
+    timeline.schedule_pull(request.user.id)
+    following_posts = timeline.feed(request.user).select_related(
+        'author', 'group'
     )
     template = 'posts/follow.html'
-    page_obj = pagination(request, following_posts, PAGE_COEF)
+    page_obj = pagination(
+        request, following_posts, PAGE_COEF,
+        date_field='feed_date', id_field='feed_id'
+    )
     context = {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        **feed_cache_context(
+            request, ('follower', request.user.id), ('groups',),
+            *[('author', post.author_id) for post in page_obj.object_list]
+        ),
     }
 
     return render(request, template, context)
@@ -0,0 +1,11 @@
+// Кнопка «Показать ещё» заменяется следующей порцией комментариев
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-load-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.href, {credentials: 'same-origin'})
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.parentElement.outerHTML = html; });
+});
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     "core.apps.CoreConfig",
     "users.apps.UsersConfig",
     "posts.apps.PostsConfig",
+    "api.apps.ApiConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.server_timing.ServerTimingMiddleware",
+    "core.db_routers.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -42,6 +45,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "core.query_budget.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "yatube.urls"
@@ -66,13 +70,39 @@ TEMPLATES = [
 WSGI_APPLICATION = "yatube.wsgi.application"
 
 
+# WAL, busy_timeout, mmap и BEGIN IMMEDIATE — см. core.db_backends.sqlite3.
+# Соединение переиспользуется между запросами DB_CONN_MAX_AGE секунд
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.db_backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 600)),
+        "OPTIONS": {
+            "BUSY_TIMEOUT": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+            "MMAP_SIZE": int(os.getenv("SQLITE_MMAP_SIZE", 64 * 2 ** 20)),
+            "CACHE_SIZE": int(os.getenv("SQLITE_CACHE_SIZE", -16000)),
+        },
     }
 }
 
+# Реплики только для чтения: DB_REPLICAS — пути к файлам через запятую,
+# синхронизируются командой sync_replicas (см. core.db_routers)
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv("DB_REPLICAS", "").split(",")), start=1
+):
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "NAME": path,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+
+# Сколько секунд после записи клиент читает только основную базу
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -114,6 +144,56 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 PAGE_COEF = 10
+# Старые ссылки ?page=N (OFFSET) обслуживаются до этой страницы,
+# дальше лента листается только курсорами
+LEGACY_PAGE_LIMIT = 10
+# Комментарии под постом подгружаются порциями по курсору
+COMMENTS_PER_PAGE = 20
+
+# Срок жизни токенов API (api.http.issue_token), секунды
+API_TOKEN_MAX_AGE = 60 * 60 * 24 * 30
+# Наибольшее число объектов в одном запросе к пакетным методам API
+API_BATCH_LIMIT = 500
+
+# Фрагменты лент сбрасываются сигналами, поэтому их можно держать долго
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+# Целые страницы для анонимов (core.page_cache): ключ меняется вместе
+# с версиями областей кэша
+PAGE_CACHE_TIMEOUT = FEED_CACHE_TIMEOUT
+
+# Лента подписок: у авторов с большим числом подписчиков посты
+# не раскладываются по лентам, а подтягиваются при чтении
+TIMELINE_FANOUT_LIMIT = 1000
+# Сколько последних постов автора добавлять в ленту при подписке
+TIMELINE_BACKFILL = 200
+
+# Потоков для фоновых задач (core.workers); 0 — выполнять сразу в запросе
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+# В тестах фоновые задачи выполняются сразу (core.test_runner)
+TEST_RUNNER = "core.test_runner.TestRunner"
+
+# Загруженные картинки (posts.images): больше IMAGE_MAX_PIXELS точек
+# отклоняются по заголовку файла, длинная сторона уменьшается
+# до IMAGE_MAX_SIZE, метаданные удаляются
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_MAX_SIZE = 2048
+IMAGE_JPEG_QUALITY = 85
+
+# Миниатюры создаются заранее в фоне (posts.thumbnails); пока их нет,
+# в шаблонах показывается заглушка
+THUMBNAIL_BACKEND = "posts.thumbnails.EagerThumbnailBackend"
+# KV-хранилище sorl с пакетным чтением для целой страницы постов
+THUMBNAIL_KVSTORE = "posts.thumbnails.KVStore"
+THUMBNAIL_DUMMY_SOURCE = STATIC_URL + "img/placeholder.svg"
+# Сколько секунд задача держит блокировку картинки
+THUMBNAIL_JOB_TIMEOUT = 60
+
+# Логировать view, превысившие бюджет SQL-запросов (core.query_budget)
+QUERY_BUDGET_LOG = os.getenv("QUERY_BUDGET_LOG", "") == "1"
+# Доля запросов, которые замеряет core.server_timing; 0 — выключено
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", 0))
+# Отдавать замеры клиенту в заголовке Server-Timing, а не только в лог
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "1") == "1"
 
 
 CSRF_FAILURE_VIEW = "core.views.csrf_failure"
@@ -121,10 +201,24 @@ CSRF_FAILURE_VIEW = "core.views.csrf_failure"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
-CACHES = {
-    "default": {
+# Кэш выбирается переменной окружения CACHE_BACKEND.
+# sqlite — общий для всех воркеров файл с LRU-вытеснением
+CACHE_BACKENDS = {
+    "locmem": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    }
+    },
+    "sqlite": {
+        "BACKEND": "core.cache_backends.sqlite.SQLiteCache",
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", os.path.join(BASE_DIR, "cache.sqlite3")
+        ),
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+CACHES = {
+    "default": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
 }
 
 INTERNAL_IPS = [